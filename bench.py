@@ -0,0 +1,203 @@
+"""
+Micro-benchmarks for the tracker.  Run with `python bench.py`; every
+benchmark prints one "name: figure" line.
+"""
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from logic import FinancialTracker
+import export
+import forecast
+from viewcache import MonthViewCache
+from events import ChangeEvent
+
+
+def _synthetic_tracker(data_file, years=10, per_day=3, seed=1):
+    """Tracker with `years` of monthly paydays and a few expenses per day"""
+    rng = random.Random(seed)
+    tracker = FinancialTracker(data_file=data_file)
+    tracker.save_data = lambda: None  # keep the benchmark about the code under test
+    start = datetime.date(2015, 1, 1)
+    categories = ["food", "transport", "rent", "fun", ""]
+    for offset in range(int(years * 365.25)):
+        day = start + datetime.timedelta(days=offset)
+        date_str = day.strftime("%Y-%m-%d")
+        txs = tracker.data["transactions"].setdefault(date_str, [])
+        if day.day == 1:
+            txs.append({"type": "income", "amount": 3000.0, "description": "Salary",
+                        "category": "salary", "timestamp": date_str})
+        for _ in range(per_day):
+            txs.append({"type": "expense", "amount": round(rng.uniform(1, 40), 2),
+                        "description": "purchase", "category": rng.choice(categories),
+                        "timestamp": date_str})
+    tracker.categories.rebuild(tracker.data["transactions"])
+    for date_str in sorted(tracker.data["transactions"]):
+        if date_str.endswith("-01"):
+            tracker._recalculate_daily_limits(date_str)
+    tracker._publish(full=True)  # the data was filled in behind the tracker's back
+    return tracker
+
+
+def bench_export(tracker, tmpdir):
+    for fmt in export.FORMATS:
+        path = os.path.join(tmpdir, f"export.{fmt}")
+        t0 = time.perf_counter()
+        rows = export.export(tracker, path, "transactions", fmt=fmt)
+        elapsed = time.perf_counter() - t0
+        print(f"export_transactions_{fmt}: {rows / elapsed:,.0f} rows/s ({rows} rows, {elapsed:.2f}s)")
+
+
+def bench_forecast(tracker, paths=5000, months=12):
+    if forecast.np is None:
+        print("forecast: skipped (NumPy not installed)")
+        return
+    start = datetime.date(2024, 12, 31)
+    t0 = time.perf_counter()
+    result = forecast.forecast(tracker, months=months, paths=paths, start_date=start, seed=1)
+    elapsed = time.perf_counter() - t0
+    days = len(result["dates"])
+    print(f"forecast_{months}m: {paths / elapsed:,.0f} paths/s ({paths} paths x {days} days, {elapsed:.2f}s)")
+
+
+def bench_range_summary(tracker, repeat=20):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        tracker.get_range_summary("2024-01-01", "2024-12-31")
+    elapsed = (time.perf_counter() - t0) / repeat
+    print(f"year_range_summary: {elapsed * 1000:.2f} ms per 366-day query")
+
+
+def bench_month_cache(tracker):
+    cache = MonthViewCache(tracker)
+    months = [(2024, m) for m in range(1, 13)]
+    t0 = time.perf_counter()
+    for year, month in months:
+        cache.get(year, month, "show_remaining")
+    cold = (time.perf_counter() - t0) / len(months)
+    t0 = time.perf_counter()
+    for year, month in months:
+        cache.get(year, month, "show_remaining")
+    warm = (time.perf_counter() - t0) / len(months)
+    print(f"month_view: {cold * 1000:.3f} ms cold, {warm * 1000:.4f} ms cached")
+
+
+def bench_snapshot(tracker, repeat=200):
+    """Full snapshot build vs publishing a one-day change"""
+    t0 = time.perf_counter()
+    tracker._publish(full=True)
+    full = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        tracker._pending.transactions.add(f"2020-01-{i % 28 + 1:02d}")
+        tracker._pending.limits.add(f"2020-01-{i % 28 + 1:02d}")
+        tracker._publish()
+        tracker._pending = ChangeEvent()
+    incremental = (time.perf_counter() - t0) / repeat
+    print(f"snapshot: {full * 1000:.1f} ms full build, {incremental * 1000:.3f} ms per one-day publish")
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_load(tracker):
+    """Time to the first usable tracker, total load time and peak memory"""
+    FinancialTracker.save_data(tracker)
+    path = tracker.data_file
+
+    def plain_json():
+        with open(path) as f:
+            json.load(f)
+    print(f"load_json: peak {_peak_memory(plain_json) / 1024 / 1024:.1f} MB (json.load of the whole file)")
+
+    for background in (False, True):
+        def load():
+            FinancialTracker(data_file=path, background_load=background).wait_loaded()
+        t0 = time.perf_counter()
+        loaded = FinancialTracker(data_file=path, background_load=background)
+        ready = time.perf_counter() - t0
+        loaded.wait_loaded()
+        total = time.perf_counter() - t0
+        name = "load_background" if background else "load_full"
+        print(f"{name}: {ready * 1000:.1f} ms to first query, {total * 1000:.1f} ms total, "
+              f"peak {_peak_memory(load) / 1024 / 1024:.1f} MB")
+
+
+def bench_compact(tracker):
+    """Run last: compaction drops most of the synthetic history"""
+    report = tracker.compact()
+    print(f"compact: {report['limits_removed']} limits, {report['adjustments_removed']} adjustments, "
+          f"{report['bytes_reclaimed'] / 1024:.0f} KB reclaimed, load "
+          f"{report['load_seconds_before'] * 1000:.1f} → {report['load_seconds_after'] * 1000:.1f} ms")
+    t0 = time.perf_counter()
+    tracker.get_range_summary("2016-01-01", "2016-12-31")
+    print(f"compact: {(time.perf_counter() - t0) * 1000:.1f} ms to recompute a compacted year")
+
+
+def _startup_runs(command, runs):
+    """Wall time and reported first-paint/ready times of `runs` probe launches"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # the probe writes to a file: the windowed build has no stdout
+        probe_file = os.path.join(tmpdir, "probe.txt")
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            proc = subprocess.run(command + [probe_file], capture_output=True, text=True, timeout=60)
+            wall = (time.perf_counter() - t0) * 1000
+            if proc.returncode != 0:
+                return None, proc.stderr.strip().splitlines()[-1:] or [f"exit code {proc.returncode}"]
+            with open(probe_file) as f:
+                fields = dict(part.split("=") for part in f.read().split())
+            results.append((wall, float(fields.get("first_paint_ms", "nan")), float(fields.get("ready_ms", "nan"))))
+    return results, None
+
+
+def bench_startup(runs=5):
+    """Time to first paint of `main.py --startup-probe`, as a script and as the PyInstaller build"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    modes = [("startup_script", [sys.executable, os.path.join(here, "main.py"), "--startup-probe"])]
+    for name in ("FinancialTracker", "FinancialTracker.exe"):
+        frozen = os.path.join(here, "dist", name)
+        if os.path.isfile(frozen):
+            modes.append(("startup_frozen", [frozen, "--startup-probe"]))
+            break
+    else:
+        print("startup_frozen: skipped (build with `pyinstaller FinancialTracker.spec` first)")
+    for label, command in modes:
+        results, error = _startup_runs(command, runs)
+        if results is None:
+            print(f"{label}: skipped ({' '.join(error)})")
+            continue
+        walls, paints, readies = (sorted(column) for column in zip(*results))
+        middle = len(results) // 2
+        print(f"{label}: {walls[middle]:.0f} ms wall, first paint {paints[middle]:.0f} ms, "
+              f"ready {readies[middle]:.0f} ms after the first import (median of {runs})")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tracker = _synthetic_tracker(os.path.join(tmpdir, "data.json"))
+        bench_export(tracker, tmpdir)
+        bench_range_summary(tracker)
+        bench_month_cache(tracker)
+        bench_forecast(tracker)
+        bench_snapshot(tracker)
+        bench_load(tracker)
+        bench_compact(tracker)
+    bench_startup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import datetime
+from calendar import monthrange
+
+DEFAULT_CATEGORY = "uncategorized"
+
+
+class CategoryIndex:
+    """
+    Running expense totals per category, kept per day and per month.
+
+    The tracker updates the index on every add/edit/remove, so breakdown
+    queries only touch the buckets of the requested range and never walk
+    the raw transaction lists.
+    """
+
+    def __init__(self):
+        self._days = {}    # "YYYY-MM-DD" -> {category: total}
+        self._months = {}  # "YYYY-MM"    -> {category: total}
+
+    def rebuild(self, transactions):
+        """Build the index from scratch (used once at load)"""
+        self._days.clear()
+        self._months.clear()
+        for date_str, txs in transactions.items():
+            for t in txs:
+                if t["type"] == "expense":
+                    self.add(date_str, t.get("category") or DEFAULT_CATEGORY, t["amount"])
+
+    def add(self, date_str, category, amount):
+        self._bump(self._days, date_str, category, amount)
+        self._bump(self._months, date_str[:7], category, amount)
+
+    def remove(self, date_str, category, amount):
+        self.add(date_str, category, -amount)
+
+    @staticmethod
+    def _bump(buckets, key, category, amount):
+        bucket = buckets.setdefault(key, {})
+        total = bucket.get(category, 0) + amount
+        if abs(total) < 1e-9:
+            # drop empty totals so float noise doesn't leave ghost categories
+            bucket.pop(category, None)
+            if not bucket:
+                del buckets[key]
+        else:
+            bucket[category] = total
+
+    def day_totals(self, date_str):
+        """Expense totals per category for one day"""
+        return dict(self._days.get(date_str, {}))
+
+    def day_total(self, date_str):
+        """Total expenses of one day across categories"""
+        return sum(self._days.get(date_str, {}).values())
+
+    def month_totals(self, year_month):
+        """Expense totals per category for one "YYYY-MM" month"""
+        return dict(self._months.get(year_month, {}))
+
+    def range_totals(self, start_date_str, end_date_str):
+        """Expense totals per category for start..end (both inclusive)"""
+        return range_totals(lambda d: self._days.get(d, {}), lambda m: self._months.get(m, {}),
+                            start_date_str, end_date_str)
+
+    def categories(self):
+        """All categories that currently have spending recorded"""
+        return sorted({c for bucket in self._months.values() for c in bucket})
+
+
+def range_totals(day_bucket, month_bucket, start_date_str, end_date_str):
+    """
+    Expense totals per category for start..end (both inclusive) from
+    per-day and per-month {category: total} buckets.  Whole months are
+    read from the month buckets, only the partial months at either edge
+    are summed day by day.
+    """
+    start = datetime.datetime.strptime(start_date_str, "%Y-%m-%d").date()
+    end = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
+    totals = {}
+    if end < start:
+        return totals
+
+    current = start
+    while current <= end:
+        month_last = datetime.date(current.year, current.month,
+                                   monthrange(current.year, current.month)[1])
+        if current.day == 1 and month_last <= end:
+            _merge(totals, month_bucket(current.strftime("%Y-%m")))
+        else:
+            stop = min(month_last, end)
+            day = current
+            while day <= stop:
+                _merge(totals, day_bucket(day.strftime("%Y-%m-%d")))
+                day += datetime.timedelta(days=1)
+        current = month_last + datetime.timedelta(days=1)
+    return totals
+
+
+def _merge(totals, bucket):
+    for category, amount in bucket.items():
+        totals[category] = totals.get(category, 0) + amount
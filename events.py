@@ -0,0 +1,44 @@
+class ChangeEvent:
+    """
+    What one mutation changed, collected while it runs and sent to the
+    tracker's subscribers once it is done.
+
+    transactions: dates whose (real or generated) transactions changed
+    limits:       dates whose stored daily limit changed, appeared or vanished
+    adjustments:  dates whose surplus adjustment changed
+    settings:     True if any setting changed
+    recurring:    True if a recurring rule was added or removed
+    """
+
+    def __init__(self):
+        self.transactions = set()
+        self.limits = set()
+        self.adjustments = set()
+        self.settings = False
+        self.recurring = False
+
+    @property
+    def dates(self):
+        """Every date touched by the change"""
+        return self.transactions | self.limits | self.adjustments
+
+    @property
+    def first(self):
+        return min(self.dates, default=None)
+
+    @property
+    def last(self):
+        return max(self.dates, default=None)
+
+    @property
+    def balance_changed(self):
+        """The overall balance depends on transactions, recurring rules and the savings setting"""
+        return bool(self.transactions) or self.settings or self.recurring
+
+    def __bool__(self):
+        return bool(self.dates) or self.settings or self.recurring
+
+    def __repr__(self):
+        return (f"ChangeEvent(transactions={sorted(self.transactions)}, limits={sorted(self.limits)}, "
+                f"adjustments={sorted(self.adjustments)}, settings={self.settings}, "
+                f"recurring={self.recurring})")
@@ -0,0 +1,230 @@
+import csv
+import json
+import struct
+import datetime
+import itertools
+
+from categories import DEFAULT_CATEGORY
+from logic import materialized_snapshot
+from snapshot import Snapshot
+
+# Column layouts for every exportable kind; "f" columns are floats, "s" strings
+COLUMNS = {
+    "transactions": [("date", "s"), ("type", "s"), ("amount", "f"), ("category", "s"),
+                     ("description", "s"), ("timestamp", "s")],
+    "daily_limits": [("date", "s"), ("limit", "f"), ("spent", "f"), ("remaining", "f"),
+                     ("adjustment", "f")],
+    "rollups":      [("month", "s"), ("category", "s"), ("spent", "f")],
+}
+
+FORMATS = ("csv", "jsonl", "columnar")
+
+COLUMNAR_MAGIC = b"FTCOL1\n"
+DEFAULT_BATCH_SIZE = 4096
+
+
+def _iter_dates(start_date_str, end_date_str):
+    """Yield every "YYYY-MM-DD" from start to end (inclusive)"""
+    current = datetime.datetime.strptime(start_date_str, "%Y-%m-%d").date()
+    end = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
+    while current <= end:
+        yield current.strftime("%Y-%m-%d")
+        current += datetime.timedelta(days=1)
+
+
+def data_range(tracker):
+    """First and last date that hold transactions or limits, or (None, None)"""
+    snapshot = tracker if isinstance(tracker, Snapshot) else tracker.snapshot()
+    return snapshot.date_range(("transactions", "daily_limits"))
+
+
+def _view(tracker, start_date_str, end_date_str):
+    """
+    Snapshot to read a range from.  Recurring occurrences count like real
+    transactions, so they are generated for the range on a copy.
+    """
+    snapshot = tracker if isinstance(tracker, Snapshot) else tracker.snapshot()
+    return materialized_snapshot(snapshot, start_date_str, end_date_str)
+
+
+def iter_transactions(tracker, start_date_str, end_date_str):
+    """Transactions in the range (recurring occurrences included), in date order, one row per transaction"""
+    tracker = _view(tracker, start_date_str, end_date_str)
+    for date_str in _iter_dates(start_date_str, end_date_str):
+        for t in itertools.chain(tracker.get_transactions_for_date(date_str),
+                                 tracker.get_recurring_for_date(date_str)):
+            yield {
+                "date": date_str,
+                "type": t["type"],
+                "amount": t["amount"],
+                "category": t.get("category") or DEFAULT_CATEGORY,
+                "description": t.get("description", ""),
+                "timestamp": t.get("timestamp", ""),
+            }
+
+
+def iter_daily_limits(tracker, start_date_str, end_date_str):
+    """Computed limit, spending and surplus adjustment for every day that has a limit"""
+    tracker = _view(tracker, start_date_str, end_date_str)
+    for date_str in _iter_dates(start_date_str, end_date_str):
+        if not tracker.has_daily_limit(date_str):
+            continue
+        limit = tracker.get_daily_limit(date_str)
+        yield {
+            "date": date_str,
+            "limit": limit,
+            "spent": tracker.get_daily_expenses(date_str),
+            "remaining": limit - tracker.get_counted_expenses(date_str),
+            "adjustment": tracker.get_surplus_adjustment(date_str),
+        }
+
+
+def iter_rollups(tracker, start_date_str, end_date_str):
+    """Spending per month and category, from the snapshot's category buckets"""
+    tracker = _view(tracker, start_date_str, end_date_str)
+    start = datetime.datetime.strptime(start_date_str, "%Y-%m-%d").date()
+    end = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
+    current = start
+    while current <= end:
+        if current.month == 12:
+            next_month = datetime.date(current.year + 1, 1, 1)
+        else:
+            next_month = datetime.date(current.year, current.month + 1, 1)
+        month_end = min(end, next_month - datetime.timedelta(days=1))
+        totals = tracker.get_category_totals(current.strftime("%Y-%m-%d"),
+                                             month_end.strftime("%Y-%m-%d"))
+        for category in sorted(totals):
+            yield {"month": current.strftime("%Y-%m"), "category": category,
+                   "spent": totals[category]}
+        current = next_month
+
+
+ROW_SOURCES = {
+    "transactions": iter_transactions,
+    "daily_limits": iter_daily_limits,
+    "rollups": iter_rollups,
+}
+
+
+def write_csv(rows, fp, columns):
+    """Write rows as CSV with a header line, returns the row count"""
+    writer = csv.DictWriter(fp, fieldnames=[name for name, _ in columns])
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, fp, columns=None):
+    """Write one JSON object per line, returns the row count"""
+    count = 0
+    for row in rows:
+        fp.write(json.dumps(row))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def write_columnar(rows, fp, columns, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write rows to a simple column-oriented binary file, returns the row count.
+
+    Layout: magic, a JSON header line with the columns, then batches of at
+    most `batch_size` rows.  Each batch is a little-endian uint32 row count
+    followed by every column in turn: float columns as packed float64,
+    string columns as uint32 byte lengths followed by the UTF-8 bytes.
+    Only one batch is held in memory at a time.
+    """
+    fp.write(COLUMNAR_MAGIC)
+    fp.write(json.dumps({"columns": columns}).encode("utf-8") + b"\n")
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            count += _write_batch(fp, batch, columns)
+            batch = []
+    if batch:
+        count += _write_batch(fp, batch, columns)
+    return count
+
+
+def _write_batch(fp, batch, columns):
+    fp.write(struct.pack("<I", len(batch)))
+    for name, kind in columns:
+        if kind == "f":
+            fp.write(struct.pack(f"<{len(batch)}d", *(float(row[name]) for row in batch)))
+        else:
+            encoded = [str(row[name]).encode("utf-8") for row in batch]
+            fp.write(struct.pack(f"<{len(encoded)}I", *(len(b) for b in encoded)))
+            fp.write(b"".join(encoded))
+    return len(batch)
+
+
+def read_columnar(fp):
+    """Yield the rows of a file written by write_columnar, batch by batch"""
+    if fp.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar export file")
+    columns = json.loads(fp.readline())["columns"]
+    while True:
+        head = fp.read(4)
+        if not head:
+            return
+        (n,) = struct.unpack("<I", head)
+        batch = {}
+        for name, kind in columns:
+            if kind == "f":
+                batch[name] = struct.unpack(f"<{n}d", fp.read(8 * n))
+            else:
+                lengths = struct.unpack(f"<{n}I", fp.read(4 * n))
+                blob = fp.read(sum(lengths))
+                values, pos = [], 0
+                for length in lengths:
+                    values.append(blob[pos:pos + length].decode("utf-8"))
+                    pos += length
+                batch[name] = values
+        for i in range(n):
+            yield {name: batch[name][i] for name, _ in columns}
+
+
+def export(tracker, path, kind="transactions", fmt=None, start_date_str=None, end_date_str=None):
+    """
+    Stream one kind of data ("transactions", "daily_limits", "rollups") for a
+    date range to `path`.  The format defaults to the file extension
+    (.csv, .jsonl, anything else → columnar).  Returns the number of rows.
+
+    Rows are read from one snapshot of the tracker, so changes made while
+    the export runs don't show up half-way through it, and recurring
+    occurrences are generated on a copy of it (see _view).
+    """
+    if kind not in ROW_SOURCES:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if fmt is None:
+        ext = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+        fmt = ext if ext in ("csv", "jsonl") else "columnar"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    snapshot = tracker if isinstance(tracker, Snapshot) else tracker.snapshot()
+    today_str = datetime.date.today().strftime("%Y-%m-%d")
+    first, last = data_range(snapshot)
+    rule_starts = [r["start"] for r in snapshot.recurring]
+    if rule_starts:
+        # occurrences up to today are data too
+        first = min([first] + rule_starts) if first else min(rule_starts)
+        last = max(last or "", today_str)
+    start_date_str = start_date_str or first
+    if start_date_str:
+        end_date_str = end_date_str or last or max(start_date_str, today_str)
+    columns = COLUMNS[kind]
+    rows = ROW_SOURCES[kind](snapshot, start_date_str, end_date_str) if start_date_str else iter(())
+
+    if fmt == "columnar":
+        with open(path, "wb") as fp:
+            return write_columnar(rows, fp, columns)
+    with open(path, "w", newline="", encoding="utf-8") as fp:
+        if fmt == "csv":
+            return write_csv(rows, fp, columns)
+        return write_jsonl(rows, fp, columns)
@@ -0,0 +1,192 @@
+"""
+Monte Carlo projection of balance and daily limits.
+
+Daily spending is bootstrapped from the tracker's own history and every
+simulated path runs through the same rollover / deficit / surplus rules as
+FinancialTracker._recalculate_daily_limits, vectorized over all paths with
+NumPy.  NumPy is optional (see requirements.txt): the release build
+leaves it out, and the rest of the app never imports this module.
+"""
+import datetime
+from calendar import monthrange
+
+try:
+    import numpy as np
+except ImportError:  # forecasting is optional, the rest of the app works without it
+    np = None
+
+import recurring
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+HISTORY_DAYS = 180
+
+
+def _parse(date_str):
+    return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def _add_months(date, months):
+    month_index = date.month - 1 + months
+    year = date.year + month_index // 12
+    month = month_index % 12 + 1
+    return datetime.date(year, month, min(date.day, monthrange(year, month)[1]))
+
+
+def spending_history(tracker, end_date, days=HISTORY_DAYS):
+    """
+    (raw, counted) daily expense samples for the `days` before end_date.
+    Recurring occurrences count as spending.  Days before the first
+    recorded transaction (or rule start) are left out so a short
+    history isn't diluted with empty days.
+    """
+    dates = [(end_date - datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days, 0, -1)]
+    tracker.ensure_recurring_window(dates[0], dates[-1])
+    tracker.wait_loaded()
+    first = min([*tracker.data["transactions"], *(r["start"] for r in tracker.get_recurring_rules())],
+                default=None)
+    if first is not None:
+        dates = [d for d in dates if d >= first] or dates
+    raw = np.array([tracker.get_daily_expenses(d) for d in dates], dtype=float)
+    counted = np.array([tracker.get_counted_expenses(d) for d in dates], dtype=float)
+    if not raw.any():
+        # nothing spent yet, simulate zero spending
+        return np.zeros(1), np.zeros(1)
+    return raw, counted
+
+
+def income_schedule(tracker, start_date, end_date):
+    """
+    {date: income} of future paydays.  Recurring income rules are used when
+    there are any; otherwise the last payday is repeated on the same day of
+    every following month.
+    """
+    start_str = start_date.strftime("%Y-%m-%d")
+    end_str = end_date.strftime("%Y-%m-%d")
+    schedule = {}
+    income_rules = [r for r in tracker.data["recurring"] if r["type"] == "income"]
+    for rule in income_rules:
+        for date_str in recurring.occurrences(rule, start_str, end_str):
+            schedule[date_str] = schedule.get(date_str, 0) + rule["amount"]
+    if income_rules:
+        return schedule
+
+    paydays = [d for d in tracker._income_dates() if d < start_str]
+    if not paydays:
+        return schedule
+    last = _parse(paydays[-1])
+    amount = tracker.get_payday_income(paydays[-1])
+    n = 1
+    while True:
+        payday = _add_months(last, n)
+        if payday > end_date:
+            return schedule
+        if payday >= start_date:
+            schedule[payday.strftime("%Y-%m-%d")] = amount
+        n += 1
+
+
+def forecast(tracker, months=12, paths=5000, percentiles=DEFAULT_PERCENTILES,
+             start_date=None, seed=None):
+    """
+    Simulate `paths` futures for `months` months after start_date (default
+    today) and return percentile bands:
+
+        {"dates": [...], "percentiles": (...),
+         "balance": array (len(percentiles), days),
+         "daily_limit": array (len(percentiles), days)}
+    """
+    if np is None:
+        raise ImportError("Forecasting needs NumPy (pip install numpy)")
+    start_date = start_date or datetime.date.today()
+    end_date = _add_months(start_date, months)
+    days = (end_date - start_date).days
+    dates = [(start_date + datetime.timedelta(days=i + 1)).strftime("%Y-%m-%d") for i in range(days)]
+    rng = np.random.default_rng(seed)
+    # past occurrences feed the history, and the current period may start on a recurring payday
+    tracker.ensure_recurring_window((start_date - datetime.timedelta(days=HISTORY_DAYS)).strftime("%Y-%m-%d"),
+                                    dates[0])
+
+    settings = tracker.data["settings"]
+    savings = settings["savings_percentage"] / 100
+    fixed = settings["fixed_daily_limit"]
+    reserved = sum(settings.get("category_budgets", {}).values())
+    surplus_enabled = settings["surplus_enabled"]
+    spread = max(1, int(settings["surplus_distribution_days"]))
+
+    raw_hist, counted_hist = spending_history(tracker, start_date)
+    picks = rng.integers(0, len(raw_hist), size=(days, paths))
+    raw = raw_hist[picks]
+    counted = counted_hist[picks]
+
+    schedule = income_schedule(tracker, start_date + datetime.timedelta(days=1), end_date)
+    paydays = sorted(schedule)
+    payday_index = {d: i for i, d in enumerate(dates)}
+
+    balance = np.full(paths, float(tracker.get_balance_summary()["remaining_balance"]))
+    balances = np.empty((days, paths))
+    limits = np.zeros((days, paths))
+
+    # Continue the period that is running today from tomorrow's stored limit
+    running = np.full(paths, float(tracker.get_daily_limit(dates[0])))
+    current = [d for d in tracker._income_dates() if d <= start_date.strftime("%Y-%m-%d")]
+    initial, period_end = 0.0, -1
+    if current:
+        payday = current[-1]
+        next_payday = paydays[0] if paydays else None
+        period_days = tracker._get_days_in_period(payday, next_payday)
+        initial = tracker._calculate_initial_daily_limit(payday, period_days)
+        period_end = (_parse(payday) - start_date).days + period_days - 1
+    adjustments = np.zeros((days + spread + 1, paths))
+    for i, d in enumerate(dates[:max(0, period_end + 1)]):
+        adjustments[i] += tracker.data["surplus_adjustments"].get(d, 0)
+
+    next_payday_at = [payday_index[d] for d in paydays if d in payday_index] + [days]
+    upcoming = 0
+    for t in range(days):
+        if t == next_payday_at[upcoming]:
+            # New period: same formula as _get_days_in_period/_calculate_initial_daily_limit
+            income = schedule[dates[t]]
+            balance = balance + income * (1 - savings)
+            following = next_payday_at[upcoming + 1]
+            if fixed is not None and fixed > 0:
+                period_days = int(income // fixed)
+                initial = max(0, fixed - reserved)
+            else:
+                if following < days:
+                    period_days = following - t
+                else:
+                    payday = _parse(dates[t])
+                    period_days = (_add_months(payday, 1) - payday).days
+                initial = max(0, income * (1 - savings) / period_days - reserved) if period_days > 0 else 0
+            period_end = t + period_days
+            running = np.full(paths, float(initial))
+            adjustments[t + 1:] = 0
+            upcoming += 1
+            balances[t] = balance - raw[t]
+            balance = balances[t]
+            continue
+
+        balance = balance - raw[t]
+        balances[t] = balance
+        if t > period_end:
+            continue  # outside any period: no limit, like the tracker
+
+        limits[t] = running
+        adjusted = initial + adjustments[t]
+        spent = counted[t]
+        under = spent <= running
+        deficit = np.where(under, 0, spent - running)
+        if surplus_enabled:
+            stop = min(t + 1 + spread, next_payday_at[upcoming], days + spread + 1)
+            if stop > t + 1:
+                adjustments[t + 1:stop] -= deficit / spread
+            running = np.where(under, adjusted + running - spent, adjusted)
+        else:
+            running = np.where(under, adjusted + running - spent, np.maximum(0, adjusted - deficit))
+
+    return {
+        "dates": dates,
+        "percentiles": tuple(percentiles),
+        "balance": np.percentile(balances, percentiles, axis=1),
+        "daily_limit": np.percentile(limits, percentiles, axis=1),
+    }
@@ -0,0 +1,115 @@
+import datetime
+import tkinter as tk
+
+CELL = 12      # cell size in pixels
+GAP = 2        # space between cells
+LEFT = 30      # room for weekday labels
+TOP = 18       # room for month labels
+
+NO_LIMIT_COLOR = "#ebedf0"
+EXCEEDED_COLOR = "#d73a49"
+# spent / limit ratio thresholds, from least to most spent
+SCALE = [(0.0, "#2da44e"), (0.25, "#4ac26b"), (0.5, "#9be9a8"), (0.75, "#f9d36b"), (1.0, "#f0883e")]
+
+
+def cell_color(limit, spent):
+    """Color of a day: grey without a limit, green→orange as spending nears it, red when over"""
+    if limit <= 0:
+        return NO_LIMIT_COLOR
+    ratio = spent / limit
+    if ratio > 1:
+        return EXCEEDED_COLOR
+    color = SCALE[0][1]
+    for threshold, c in SCALE:
+        if ratio >= threshold:
+            color = c
+    return color
+
+
+def cell_position(date, first_day):
+    """(column, row) of a date: one column per week, Monday on top"""
+    grid_start = first_day - datetime.timedelta(days=first_day.weekday())
+    return (date - grid_start).days // 7, date.weekday()
+
+
+def cell_box(column, row):
+    x = LEFT + column * (CELL + GAP)
+    y = TOP + row * (CELL + GAP)
+    return x, y, x + CELL, y + CELL
+
+
+class YearHeatmap(tk.Canvas):
+    """
+    Spent-vs-limit heatmap of a date range drawn on one canvas: one
+    rectangle per day instead of a widget per day.  `on_select(date)` is
+    called when a day is clicked.
+    """
+
+    def __init__(self, master, tracker, on_select=None, **kwargs):
+        super().__init__(master, background="white", highlightthickness=0, **kwargs)
+        self.tracker = tracker
+        self.on_select = on_select
+        self.first_day = None
+        self.last_day = None
+        self._cells = {}      # date_str: canvas item id
+        self._selected = None
+        self.bind("<Button-1>", self._on_click)
+
+    def show(self, first_day, last_day):
+        """Draw first_day..last_day from a single range query"""
+        self.first_day, self.last_day = first_day, last_day
+        self.delete("all")
+        self._cells = {}
+        self._selected = None
+
+        for row, name in ((0, "Mon"), (2, "Wed"), (4, "Fri")):
+            self.create_text(LEFT - 4, TOP + row * (CELL + GAP) + CELL // 2, text=name,
+                             anchor="e", font=("TkDefaultFont", 7))
+
+        summary = self.tracker.get_range_summary(first_day.strftime("%Y-%m-%d"),
+                                                 last_day.strftime("%Y-%m-%d"))
+        date = first_day
+        for date_str, limit, spent, counted in summary:
+            column, row = cell_position(date, first_day)
+            if date.day == 1 or date == first_day:
+                self.create_text(cell_box(column, 0)[0], TOP - 4, text=date.strftime("%b"),
+                                 anchor="sw", font=("TkDefaultFont", 7))
+            self._cells[date_str] = self.create_rectangle(
+                *cell_box(column, row), width=0, fill=cell_color(limit, counted),
+                tags=("day", date_str))
+            date += datetime.timedelta(days=1)
+
+        columns = cell_position(last_day, first_day)[0] + 1
+        self.config(width=LEFT + columns * (CELL + GAP), height=TOP + 7 * (CELL + GAP))
+
+    def update_days(self, dates):
+        """Recolor only the given dates (those that are on the canvas)"""
+        for date_str in dates:
+            item = self._cells.get(date_str)
+            if item is None:
+                continue
+            _, limit, spent, counted = self.tracker.get_range_summary(date_str, date_str)[0]
+            self.itemconfig(item, fill=cell_color(limit, counted))
+
+    def select(self, date_str):
+        """Outline the selected day"""
+        if self._selected in self._cells:
+            self.itemconfig(self._cells[self._selected], width=0)
+        self._selected = date_str
+        if date_str in self._cells:
+            self.itemconfig(self._cells[date_str], width=2, outline="#0969da")
+
+    def _on_click(self, event):
+        if self.first_day is None:
+            return
+        column = (event.x - LEFT) // (CELL + GAP)
+        row = (event.y - TOP) // (CELL + GAP)
+        if column < 0 or not 0 <= row < 7:
+            return
+        grid_start = self.first_day - datetime.timedelta(days=self.first_day.weekday())
+        date = grid_start + datetime.timedelta(days=column * 7 + row)
+        if not self.first_day <= date <= self.last_day:
+            return
+        self.select(date.strftime("%Y-%m-%d"))
+        if self.on_select:
+            self.on_select(date)
@@ -0,0 +1,180 @@
+import datetime
+from collections import deque
+
+DEFAULT_HISTORY_SIZE = 100
+
+
+class Command:
+    """
+    One ledger mutation.  A command only stores its own delta; `apply` and
+    `revert` change the tracker's data in place and the tracker then runs
+    the incremental recalculation starting at `recalc_from` (None means the
+    whole ledger, used by settings changes).
+    """
+    recalc_from = None
+    refreshes_recurring = False  # recurring rules changed, regenerate occurrences
+    overwritten = None  # limits/adjustments before the last apply, restored by undo
+
+    def apply(self, tracker):
+        raise NotImplementedError
+
+    def revert(self, tracker):
+        raise NotImplementedError
+
+
+class AddTransaction(Command):
+    def __init__(self, date_str, tx):
+        self.date_str = date_str
+        self.recalc_from = date_str
+        self.tx = tx
+        self.idx = None
+        self.adjustments = {}  # date: amount added to surplus_adjustments
+
+    def apply(self, tracker):
+        self.idx = tracker._insert_transaction(self.date_str, self.tx)
+        self.adjustments = {}
+        if self.tx["type"] == "income":
+            income_dates = sorted(
+                d for d, txs in tracker.data["transactions"].items()
+                if any(t["type"] == "income" for t in txs)
+            )
+            # first income of period = “payday”, anything later = “top-up”
+            if income_dates and self.date_str != income_dates[0]:
+                days = max(1, tracker.data["settings"].get("surplus_distribution_days", 4))
+                chunk = self.tx["amount"] / days
+                base = datetime.datetime.strptime(self.date_str, "%Y-%m-%d").date()
+                for i in range(days):
+                    key = (base + datetime.timedelta(days=i)).strftime("%Y-%m-%d")
+                    self.adjustments[key] = chunk
+                _shift_adjustments(tracker, self.adjustments, 1)
+
+    def revert(self, tracker):
+        _shift_adjustments(tracker, self.adjustments, -1)
+        tracker._pop_transaction(self.date_str, self.idx)
+
+
+class RemoveTransaction(Command):
+    def __init__(self, date_str, idx):
+        self.date_str = date_str
+        self.recalc_from = date_str
+        self.idx = idx
+        self.tx = None
+
+    def apply(self, tracker):
+        self.tx = tracker._pop_transaction(self.date_str, self.idx)
+
+    def revert(self, tracker):
+        tracker._insert_transaction(self.date_str, self.tx, self.idx)
+
+
+class EditTransaction(Command):
+    def __init__(self, date_str, idx, changes):
+        self.date_str = date_str
+        self.recalc_from = date_str
+        self.idx = idx
+        self.after = changes
+        self.before = {}
+        self.missing = []  # fields the transaction didn't have (older data)
+
+    def apply(self, tracker):
+        tx = tracker.data["transactions"][self.date_str][self.idx]
+        self.before = {k: tx[k] for k in self.after if k in tx}
+        self.missing = [k for k in self.after if k not in tx]
+        tracker._update_transaction(self.date_str, self.idx, self.after)
+
+    def revert(self, tracker):
+        tracker._update_transaction(self.date_str, self.idx, self.before, drop=self.missing)
+
+
+class ChangeSettings(Command):
+    def __init__(self, changes):
+        self.after = changes
+        self.before = {}
+
+    def apply(self, tracker):
+        settings = tracker.data["settings"]
+        self.before = {k: settings.get(k) for k in self.after}
+        settings.update(self.after)
+        tracker._pending.settings = True
+
+    def revert(self, tracker):
+        tracker.data["settings"].update(self.before)
+        tracker._pending.settings = True
+
+
+class AddRecurringRule(Command):
+    refreshes_recurring = True
+
+    def __init__(self, rule):
+        self.rule = rule
+
+    def apply(self, tracker):
+        tracker.data["recurring"].append(self.rule)
+        tracker._pending.recurring = True
+
+    def revert(self, tracker):
+        tracker.data["recurring"].remove(self.rule)
+        tracker._pending.recurring = True
+
+
+class RemoveRecurringRule(Command):
+    refreshes_recurring = True
+
+    def __init__(self, rule_id):
+        self.rule_id = rule_id
+        self.idx = None
+        self.rule = None
+
+    def apply(self, tracker):
+        rules = tracker.data["recurring"]
+        self.idx = next(i for i, r in enumerate(rules) if r["id"] == self.rule_id)
+        self.rule = rules.pop(self.idx)
+        tracker._pending.recurring = True
+
+    def revert(self, tracker):
+        tracker.data["recurring"].insert(self.idx, self.rule)
+        tracker._pending.recurring = True
+
+
+def _shift_adjustments(tracker, adjustments, sign):
+    surplus = tracker.data["surplus_adjustments"]
+    for key, amount in adjustments.items():
+        tracker._remember("surplus_adjustments", key)
+        value = surplus.get(key, 0) + sign * amount
+        if abs(value) < 1e-9:
+            surplus.pop(key, None)
+        else:
+            surplus[key] = value
+        tracker._pending.adjustments.add(key)
+
+
+class CommandHistory:
+    """Bounded undo/redo stacks of applied commands"""
+
+    def __init__(self, max_size=DEFAULT_HISTORY_SIZE):
+        self._undo = deque(maxlen=max_size)
+        self._redo = []
+
+    def record(self, command):
+        self._undo.append(command)
+        self._redo.clear()
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def pop_undo(self):
+        command = self._undo.pop()
+        self._redo.append(command)
+        return command
+
+    def pop_redo(self):
+        command = self._redo.pop()
+        self._undo.append(command)
+        return command
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
@@ -0,0 +1,138 @@
+import json
+import queue
+import threading
+
+CHUNK_SIZE = 64 * 1024
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _Reader:
+    """Sliding window over a text file: only the unparsed tail is kept in memory"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ("" at the end of the file)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number cut off at the chunk boundary ("12" of "12.5") still decodes, just too short
+            if (end == len(self.buf) or self.buf[end] in _NUMBER_CHARS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_entries(f, chunk_size=CHUNK_SIZE):
+    """
+    Stream the top-level object of a JSON file as (section, key, value)
+    tuples: an object-valued section gives (section, None, {}) followed by
+    one (section, key, value) per entry, any other section a single
+    (section, None, value).
+    """
+    reader = _Reader(f, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        section = reader.value()
+        reader.expect(":")
+        if reader.peek() == "{":
+            reader.pos += 1
+            yield section, None, {}
+            if reader.peek() == "}":
+                reader.pos += 1
+            else:
+                while True:
+                    key = reader.value()
+                    reader.expect(":")
+                    yield section, key, reader.value()
+                    if reader.peek() != ",":
+                        break
+                    reader.pos += 1
+                reader.expect("}")
+        else:
+            yield section, None, reader.value()
+        if reader.peek() != ",":
+            break
+        reader.pos += 1
+    reader.expect("}")
+
+
+def iter_file(path, chunk_size=CHUNK_SIZE):
+    """iter_entries() over a file that stays open until the stream is exhausted"""
+    with open(path, "r") as f:
+        yield from iter_entries(f, chunk_size)
+
+
+class BackgroundLoader:
+    """
+    Drains the rest of an entry stream on a worker thread.  Entries are
+    handed over in batches through a bounded queue, so only a few parsed
+    batches wait for the consumer at any time; the consumer merges them
+    on its own thread.
+    """
+
+    def __init__(self, entries, batch_size=1000, max_batches=4):
+        self._queue = queue.Queue(maxsize=max_batches)
+        self._thread = threading.Thread(target=self._run, args=(entries, batch_size), daemon=True)
+        self._thread.start()
+
+    def _run(self, entries, batch_size):
+        batch = []
+        try:
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    self._queue.put(batch)
+                    batch = []
+            self._queue.put(batch)
+            self._queue.put(None)
+        except Exception as e:
+            self._queue.put(e)
+
+    def next_batch(self, block=True):
+        """
+        Next list of entries, [] if none is ready yet (block=False) and None
+        once the stream is done.  A parse error is re-raised here.
+        """
+        try:
+            item = self._queue.get(block)
+        except queue.Empty:
+            return []
+        if isinstance(item, Exception):
+            raise item
+        return item
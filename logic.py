@@ -1,41 +1,256 @@
 import json
+import copy
 import datetime
 from calendar import monthrange
 import os
+import time
+import bisect
+import threading
+from categories import CategoryIndex, DEFAULT_CATEGORY
+from events import ChangeEvent
+from snapshot import Snapshot
+from history import (CommandHistory, AddTransaction, RemoveTransaction,
+                     EditTransaction, ChangeSettings, AddRecurringRule, RemoveRecurringRule)
+import recurring
+import jsonstream
+
+UNORDERED = "9999-12-31"  # _loaded_from once dates stop arriving newest first
+
+
+def transaction_index(transactions):
+    """(sorted dates, sorted income dates) of {date: [transactions]}, for recompute_period"""
+    dates = sorted(transactions)
+    return dates, [d for d in dates if any(t["type"] == "income" for t in transactions[d])]
+
+
+def recompute_period(settings, rules, transactions, date_str, index=None):
+    """
+    (limits, adjustments) of the pay period holding date_str, recalculated
+    on a throwaway tracker from `transactions` ({date: [transactions]})
+    and the occurrences of the recurring `rules`.  Nothing is read from or
+    written to a live tracker, so snapshots can use it too.  Pass the
+    transaction_index() when recomputing many periods of the same data.
+    """
+    dates, income_dates = index or transaction_index(transactions)
+    i = bisect.bisect_right(income_dates, date_str)
+    paydays = set(income_dates[max(0, i - 1):i + 1])  # the last one on/before date_str and the next
+    for rule in rules:
+        if rule["type"] == "income":
+            paydays.update(d for d in recurring.around(rule, date_str) if d)
+    payday = max((d for d in paydays if d <= date_str), default=None)
+    if payday is None:
+        return {}, {}
+    next_payday = min((d for d in paydays if d > date_str), default=None)
+    tracker = FinancialTracker._detached({
+        "settings": settings,
+        "transactions": {d: list(transactions[d]) for d in _between(dates, payday, next_payday or UNORDERED)},
+        "daily_limits": {},
+        "surplus_adjustments": {},
+        "recurring": list(rules),
+        "compacted_through": None,
+        "compacted_basis": None,
+    })
+    # the payday's own occurrences first: a fixed limit sizes the period by its income
+    tracker._add_generated(recurring.materialize(rules, payday, payday))
+    end = next_payday or FinancialTracker._shift_date(payday, tracker._get_days_in_period(payday))
+    if end > payday:
+        tracker._add_generated(recurring.materialize(rules, FinancialTracker._shift_date(payday, 1), end))
+    tracker._recalculate_daily_limits(date_str)
+    return tracker.data["daily_limits"], tracker.data["surplus_adjustments"]
+
+
+def materialized_snapshot(snapshot, start_date_str, end_date_str):
+    """
+    `snapshot` with the recurring occurrences between start and end
+    (inclusive) generated and their periods recalculated.  The work is done
+    on a throwaway tracker, so the live tracker and its materialized window
+    are left alone and it is safe on any thread.
+    """
+    if not snapshot.recurring:
+        return snapshot
+    tracker = FinancialTracker._detached(snapshot.to_dict())
+    tracker.ensure_recurring_window(start_date_str, end_date_str)
+    tracker._publish()
+    return tracker._snapshot
+
+
+def _between(keys, lo, hi):
+    """The part of sorted `keys` within lo..hi (inclusive)"""
+    return keys[bisect.bisect_left(keys, lo):bisect.bisect_right(keys, hi)]
+
 
 class FinancialTracker:
-    def __init__(self, data_file="data.json"):
+    def __init__(self, data_file="data.json", background_load=False):
         self.data_file = data_file
-        self.data = self._load_data()
+        # With background_load only settings, limits and the transactions of
+        # the current month are parsed here; older ones arrive in batches.
+        self._loader = None
+        self._loaded_from = None  # while loading: transactions on/after this date are complete
+        self._deferred_dates = set()  # occurrences generated while loading, recalculated once done
+        self.data = self._load_data(background_load)
+        self._init_state()
+        if self._loader is None:
+            self.compact(measure=False)
+        else:
+            self._publish(full=True)
+
+    @classmethod
+    def _detached(cls, data):
+        """Tracker over in-memory data, without a file behind it"""
+        tracker = cls.__new__(cls)
+        tracker.data_file = None
+        tracker._loader = None
+        tracker._loaded_from = None
+        tracker.data = data
+        tracker._init_state()
+        return tracker
+
+    def _init_state(self):
+        """Everything derived from self.data"""
+        # Loading is finished on the thread that created the tracker; others wait for this
+        self._owner = threading.get_ident()
+        self._loaded = threading.Event()
+        if self._loader is None:
+            self._loaded.set()
+        self.categories = CategoryIndex()
+        self.categories.rebuild(self.data["transactions"])
+        self.history = CommandHistory()
+        # While a command runs: {section: {date: value before it, None if absent}}
+        self._journal = None
+        # Recurring occurrences are only materialized for the window in use
+        self._generated = {}            # date: [virtual transactions]
+        self._recurring_window = None   # (start, end) that is materialized
+        # Change notification
+        self._listeners = []
+        self._pending = ChangeEvent()
+        # Limits of compacted periods, recomputed on demand and never saved
+        self._recomputed_limits = {}
+        self._recomputed_adjustments = {}
+        # Immutable view for readers, replaced after every change
+        self._snapshot = None
 
-    def _load_data(self):
-        """Load data from JSON file or create default structure if file doesn't exist"""
+    def _load_data(self, background=False):
+        """
+        Load data from JSON file or create default structure if file doesn't exist.
+
+        The file is parsed incrementally.  With `background`, parsing stops
+        once every other section and the transactions of the current month
+        are in (save_data writes them first, newest date first) and the rest
+        is handed to a BackgroundLoader.
+        """
         if os.path.exists(self.data_file) and os.path.getsize(self.data_file) > 0:
+            head = set(self._create_default_data()) - {"transactions"}
+            month_start = datetime.date.today().strftime("%Y-%m-01")
+            loaded_data = {}
+            seen = set()
+            previous = None
+            descending = True
+            entries = jsonstream.iter_file(self.data_file)
             try:
-                with open(self.data_file, 'r') as f:
-                    loaded_data = json.load(f)
-                    # Ensure default settings exist if loading older data
-                    if "settings" not in loaded_data:
-                        loaded_data["settings"] = self._create_default_data()["settings"]
-                    else:
-                        # Add new settings if missing
-                        if "surplus_enabled" not in loaded_data["settings"]:
-                            loaded_data["settings"]["surplus_enabled"] = False
-                        if "surplus_distribution_days" not in loaded_data["settings"]:
-                            loaded_data["settings"]["surplus_distribution_days"] = 4
-                    if "transactions" not in loaded_data:
-                        loaded_data["transactions"] = {}
-                    if "daily_limits" not in loaded_data:
-                        loaded_data["daily_limits"] = {}
-                    if "surplus_adjustments" not in loaded_data:
-                        loaded_data["surplus_adjustments"] = {} # Store future deductions
-                    return loaded_data
+                for section, key, value in entries:
+                    seen.add(section)
+                    self._merge_entry(loaded_data, section, key, value)
+                    if section != "transactions" or key is None:
+                        continue
+                    descending = descending and (previous is None or key < previous)
+                    previous = key
+                    if background and descending and key < month_start and head <= seen:
+                        self._loader = jsonstream.BackgroundLoader(entries)
+                        self._loaded_from = key
+                        break
             except json.JSONDecodeError:
                 # If file exists but is corrupted, create new data structure
                 return self._create_default_data()
+            return self._with_defaults(loaded_data)
         else:
             return self._create_default_data()
 
+    @staticmethod
+    def _merge_entry(data, section, key, value):
+        if key is None:
+            data[section] = value
+        else:
+            data[section][key] = value
+
+    def _with_defaults(self, loaded_data):
+        """Ensure default settings exist if loading older data"""
+        if "settings" not in loaded_data:
+            loaded_data["settings"] = self._create_default_data()["settings"]
+        else:
+            # Add new settings if missing
+            if "surplus_enabled" not in loaded_data["settings"]:
+                loaded_data["settings"]["surplus_enabled"] = False
+            if "surplus_distribution_days" not in loaded_data["settings"]:
+                loaded_data["settings"]["surplus_distribution_days"] = 4
+            if "category_budgets" not in loaded_data["settings"]:
+                loaded_data["settings"]["category_budgets"] = {}
+        if "transactions" not in loaded_data:
+            loaded_data["transactions"] = {}
+        if "daily_limits" not in loaded_data:
+            loaded_data["daily_limits"] = {}
+        if "surplus_adjustments" not in loaded_data:
+            loaded_data["surplus_adjustments"] = {} # Store future deductions
+        if "recurring" not in loaded_data:
+            loaded_data["recurring"] = []
+        if "compacted_through" not in loaded_data:
+            loaded_data["compacted_through"] = None
+        if "compacted_basis" not in loaded_data:
+            loaded_data["compacted_basis"] = None
+        return loaded_data
+
+    # --- background loading ---
+
+    @property
+    def is_loading(self):
+        return self._loader is not None
+
+    def load_step(self, max_batches=4):
+        """
+        Merge up to `max_batches` batches the loader has parsed so far,
+        without blocking.  Returns True while there is more to load.
+        """
+        for _ in range(max_batches):
+            if self._loader is None or not self._merge_next(block=False):
+                break
+        return self._loader is not None
+
+    def wait_loaded(self):
+        """Block until the whole file is loaded"""
+        while self._loader is not None:
+            self._merge_next(block=True)
+
+    def _ensure_loaded(self, date_str):
+        """Block until the transactions of date_str (and of every later date) are loaded"""
+        while self._loader is not None and date_str < self._loaded_from:
+            self._merge_next(block=True)
+
+    def _merge_next(self, block):
+        """Merge the next parsed batch.  Returns False if none was ready."""
+        try:
+            batch = self._loader.next_batch(block)
+        except json.JSONDecodeError:
+            batch = None  # keep what was read before the corrupted part
+        if batch is None:
+            self._loader = None
+            self._loaded_from = None
+            deferred, self._deferred_dates = self._deferred_dates, set()
+            if deferred:
+                self._recalculate_dates(deferred)
+            self.compact(measure=False)
+            self._emit()
+            self._loaded.set()
+            return True
+        for section, key, value in batch:
+            self._merge_entry(self.data, section, key, value)
+            if section == "transactions" and key is not None:
+                for t in value:
+                    if t["type"] == "expense":
+                        self.categories.add(key, t.get("category") or DEFAULT_CATEGORY, t["amount"])
+                # dates arrive newest first; anything else means waiting for the end
+                if self._loaded_from != UNORDERED:
+                    self._loaded_from = key if key < self._loaded_from else UNORDERED
+        return bool(batch)
+
     def _create_default_data(self):
         """Create default data structure"""
         return {
@@ -43,124 +258,625 @@ class FinancialTracker:
                 "savings_percentage": 0,  # Default 0% savings
                 "fixed_daily_limit": None,  # No fixed daily limit by default
                 "surplus_enabled": False, # Surplus distribution disabled by default
-                "surplus_distribution_days": 4 # Default distribution over 4 days
+                "surplus_distribution_days": 4, # Default distribution over 4 days
+                "category_budgets": {} # category: daily budget carved out of the limit
             },
             "transactions": {},  # Will store transactions by date
             "daily_limits": {},   # Will store calculated daily limits
-            "surplus_adjustments": {} # Stores date: adjustment_amount
+            "surplus_adjustments": {}, # Stores date: adjustment_amount
+            "recurring": [], # Recurring rules, occurrences are generated on demand
+            "compacted_through": None, # Limits up to this date were dropped by compact()
+            "compacted_basis": None # Settings and rules compacted periods are recomputed with
         }
 
     def save_data(self):
-        """Save data to JSON file"""
+        """
+        Save data to JSON file.  Small sections come first and dated
+        sections newest first, so a background load can show the current
+        month before the rest of the history is parsed.
+        """
+        self.wait_loaded()
+        self._publish()
+        ordered = self._snapshot.to_dict()
+        ordered.update((k, v) for k, v in self.data.items() if k not in ordered)
         with open(self.data_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+            json.dump(ordered, f, indent=2)
 
     def add_transaction(
         self,
         date_str: str,
         amount: float,
         transaction_type: str = "expense",
-        description: str = ""
+        description: str = "",
+        category: str = DEFAULT_CATEGORY
     ):
         """Add income / expense.  Mid-period incomes are treated as top-ups."""
-        self.data["transactions"].setdefault(date_str, [])
-        amount = abs(float(amount))  # always positive
-
-        self.data["transactions"][date_str].append({
+        self._execute(AddTransaction(date_str, {
             "type": transaction_type,
-            "amount": amount,
+            "amount": abs(float(amount)),  # always positive
             "description": description,
+            "category": category.strip() or DEFAULT_CATEGORY,
             "timestamp": datetime.datetime.now().isoformat()
-        })
-
-        # supplemental income logic
-        if transaction_type == "income":
-            income_dates = sorted(
-                d for d, txs in self.data["transactions"].items()
-                if any(t["type"] == "income" for t in txs)
-            )
-            # first income of period = “payday”, anything later = “top-up”
-            if income_dates and date_str != income_dates[0]:
-                days = max(1, self.data["settings"].get("surplus_distribution_days", 4))
-                chunk = amount / days
-                base  = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-                for i in range(days):
-                    key = (base + datetime.timedelta(days=i)).strftime("%Y-%m-%d")
-                    self.data["surplus_adjustments"][key] = self.data["surplus_adjustments"].get(key, 0) + chunk
-                # no new payday created → just recalc from today onward
-                self._recalculate_daily_limits(date_str)
-                self.save_data()
-                return
-
-        # default path
-        self._recalculate_daily_limits(date_str)
-        self.save_data()
+        }))
 
     def remove_transaction(self, date_str, idx):
         """Delete a transaction by list index, then recalc limits."""
         try:
-            self.data["transactions"][date_str].pop(idx)
-            if not self.data["transactions"][date_str]:
-                del self.data["transactions"][date_str]
-            self._recalculate_daily_limits(date_str)
-            self.save_data()
+            self.data["transactions"][date_str][idx]
         except (KeyError, IndexError):
             raise ValueError("Bad date or index")
+        if idx < 0:
+            idx += len(self.data["transactions"][date_str])
+        self._execute(RemoveTransaction(date_str, idx))
 
     def edit_transaction(self, date_str, idx, *, amount=None,
-                        transaction_type=None, description=None):
+                        transaction_type=None, description=None, category=None):
         """In-place edit, keep timestamp."""
-        t = self.data["transactions"][date_str][idx]
-        if amount is not None:          t["amount"] = abs(float(amount))
-        if transaction_type is not None: t["type"]   = transaction_type
-        if description is not None:      t["description"] = description
-        self._recalculate_daily_limits(date_str)
-        self.save_data()
+        self.data["transactions"][date_str][idx]  # let bad date/index raise before recording
+        changes = {}
+        if amount is not None:           changes["amount"] = abs(float(amount))
+        if transaction_type is not None: changes["type"] = transaction_type
+        if description is not None:      changes["description"] = description
+        if category is not None:         changes["category"] = category.strip() or DEFAULT_CATEGORY
+        self._execute(EditTransaction(date_str, idx, changes))
 
     def set_savings_percentage(self, percentage):
         """Set savings percentage (0-100)"""
         percentage = max(0, min(100, float(percentage)))
-        self.data["settings"]["savings_percentage"] = percentage
-        self.data["settings"]["fixed_daily_limit"] = None  # Clear fixed daily limit when using percentage
-        self._recalculate_all_daily_limits()
-        self.save_data()
+        self._execute(ChangeSettings({
+            "savings_percentage": percentage,
+            "fixed_daily_limit": None  # Clear fixed daily limit when using percentage
+        }))
 
     def set_fixed_daily_limit(self, limit):
         """Set a fixed daily spending limit"""
-        self.data["settings"]["fixed_daily_limit"] = float(limit)
-        self.data["settings"]["savings_percentage"] = 0  # Clear savings percentage when using fixed limit
-        self._recalculate_all_daily_limits()
-        self.save_data()
+        self._execute(ChangeSettings({
+            "fixed_daily_limit": float(limit),
+            "savings_percentage": 0  # Clear savings percentage when using fixed limit
+        }))
 
     def set_surplus_settings(self, enabled, distribution_days):
         """Set surplus distribution settings"""
-        self.data["settings"]["surplus_enabled"] = bool(enabled)
-        self.data["settings"]["surplus_distribution_days"] = max(1, int(distribution_days)) # Ensure at least 1 day
-        self._recalculate_all_daily_limits()
+        self._execute(ChangeSettings({
+            "surplus_enabled": bool(enabled),
+            "surplus_distribution_days": max(1, int(distribution_days))  # Ensure at least 1 day
+        }))
+
+    def set_category_budget(self, category, daily_budget):
+        """Set (or clear with None/0) a daily budget for a category"""
+        budgets = dict(self.data["settings"].get("category_budgets", {}))
+        category = category.strip() or DEFAULT_CATEGORY
+        if daily_budget is None or float(daily_budget) <= 0:
+            budgets.pop(category, None)
+        else:
+            budgets[category] = float(daily_budget)
+        self._execute(ChangeSettings({"category_budgets": budgets}))
+
+    def add_recurring_rule(self, start_date_str, amount, transaction_type="expense",
+                           frequency="monthly", description="", category=DEFAULT_CATEGORY,
+                           interval=1, end_date_str=None):
+        """Add a recurring income/expense rule, returns its id"""
+        rule_id = max((r["id"] for r in self.data["recurring"]), default=0) + 1
+        rule = recurring.make_rule(rule_id, start_date_str, amount, transaction_type, frequency,
+                                   description, category, interval, end_date_str)
+        self._execute(AddRecurringRule(rule))
+        return rule_id
+
+    def remove_recurring_rule(self, rule_id):
+        """Delete a recurring rule (all of its generated occurrences disappear)"""
+        if not any(r["id"] == rule_id for r in self.data["recurring"]):
+            raise ValueError("Unknown recurring rule")
+        self._execute(RemoveRecurringRule(rule_id))
+
+    def get_recurring_rules(self):
+        """Get all recurring rules"""
+        return list(self.data["recurring"])
+
+    # --- change notification ---
+
+    def subscribe(self, callback):
+        """Call `callback(event)` with a ChangeEvent after every mutation"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def snapshot(self):
+        """
+        The latest published Snapshot, in O(1).  It never changes, so it can
+        be read (exported, saved) on another thread while the tracker moves on.
+
+        During a background load the owning thread finishes the load first;
+        any other thread waits until the owner has (it never merges itself).
+        """
+        if threading.get_ident() == self._owner:
+            self.wait_loaded()
+        else:
+            self._loaded.wait()
+        return self._snapshot
+
+    def _publish(self, full=False):
+        """Publish the data as a new snapshot: a full copy, or just what _pending touched"""
+        if full or self._snapshot is None:
+            version = 0 if self._snapshot is None else self._snapshot.version + 1
+            self._snapshot = Snapshot.build(self, version)
+        elif self._pending:
+            self._snapshot = self._snapshot.evolve(self, self._pending)
+
+    def _emit(self):
+        """Publish the pending change as a snapshot and tell the subscribers"""
+        self._publish()
+        event, self._pending = self._pending, ChangeEvent()
+        if event:
+            self._recomputed_limits.clear()
+            self._recomputed_adjustments.clear()
+            for callback in list(self._listeners):
+                callback(event)
+
+    # --- command execution / undo ---
+
+    def _execute(self, command):
+        """Apply a mutation, record it for undo, recalc the affected range and save"""
+        self.wait_loaded()
+        self._run(command)
+        self.history.record(command)
+        self._emit()
         self.save_data()
 
+    def _run(self, command):
+        """Apply a command and recalc, recording what it overwrote for undo"""
+        self._journal = {"daily_limits": {}, "surplus_adjustments": {}}
+        try:
+            command.apply(self)
+            self._recalculate_after(command)
+        finally:
+            command.overwritten, self._journal = self._journal, None
+
+    def _remember(self, section, date_str):
+        """Journal the value a command is about to change (first change wins)"""
+        if self._journal is not None:
+            self._journal[section].setdefault(date_str, self.data[section].get(date_str))
+
+    def _restore(self, overwritten):
+        for section, changed in (("daily_limits", self._pending.limits),
+                                 ("surplus_adjustments", self._pending.adjustments)):
+            for date_str, value in overwritten[section].items():
+                if value is None:
+                    self.data[section].pop(date_str, None)
+                else:
+                    self.data[section][date_str] = value
+                changed.add(date_str)
+
+    def _recalculate_after(self, command):
+        if command.refreshes_recurring:
+            self._rematerialize_recurring()
+        elif command.recalc_from is None:
+            self._recalculate_all_daily_limits()
+        else:
+            self._recalculate_daily_limits(command.recalc_from)
+
+    def can_undo(self):
+        return self.history.can_undo()
+
+    def can_redo(self):
+        return self.history.can_redo()
+
+    def undo(self):
+        """Revert the most recent mutation.  Returns False if there is nothing to undo."""
+        if not self.history.can_undo():
+            return False
+        self.wait_loaded()
+        command = self.history.pop_undo()
+        command.revert(self)
+        self._recalculate_after(command)
+        # the recalculation only covers the restored periods; put back
+        # every limit/adjustment the command wrote, created or deleted
+        self._restore(command.overwritten)
+        self._emit()
+        self.save_data()
+        return True
+
+    def redo(self):
+        """Re-apply the most recently undone mutation.  Returns False if there is nothing to redo."""
+        if not self.history.can_redo():
+            return False
+        self.wait_loaded()
+        command = self.history.pop_redo()
+        self._run(command)
+        self._emit()
+        self.save_data()
+        return True
+
+    # --- raw transaction primitives (keep the category index in sync) ---
+
+    def _insert_transaction(self, date_str, tx, idx=None):
+        """Insert a transaction (append when idx is None), returns its index"""
+        txs = self.data["transactions"].setdefault(date_str, [])
+        if idx is None:
+            idx = len(txs)
+        txs.insert(idx, tx)
+        self._pending.transactions.add(date_str)
+        if tx["type"] == "expense":
+            self.categories.add(date_str, tx.get("category") or DEFAULT_CATEGORY, tx["amount"])
+        return idx
+
+    def _pop_transaction(self, date_str, idx):
+        """Remove and return a transaction, dropping the date once it is empty"""
+        txs = self.data["transactions"][date_str]
+        tx = txs.pop(idx)
+        self._pending.transactions.add(date_str)
+        if tx["type"] == "expense":
+            self.categories.remove(date_str, tx.get("category") or DEFAULT_CATEGORY, tx["amount"])
+        if not txs:
+            del self.data["transactions"][date_str]
+        return tx
+
+    def _update_transaction(self, date_str, idx, fields, drop=()):
+        """Overwrite some fields of a transaction (and delete the `drop` ones)"""
+        txs = self.data["transactions"][date_str]
+        tx = txs[idx]
+        if tx["type"] == "expense":
+            self.categories.remove(date_str, tx.get("category") or DEFAULT_CATEGORY, tx["amount"])
+        # replaced, not edited in place: snapshots share transaction dicts
+        tx = dict(tx, **fields)
+        for key in drop:
+            tx.pop(key, None)
+        txs[idx] = tx
+        self._pending.transactions.add(date_str)
+        if tx["type"] == "expense":
+            self.categories.add(date_str, tx.get("category") or DEFAULT_CATEGORY, tx["amount"])
+
+    # --- recurring materialization ---
+
+    def ensure_recurring_window(self, start_date_str, end_date_str):
+        """
+        Make sure recurring occurrences between start and end (inclusive) are
+        materialized, generating only the part of the window that is new and
+        recalculating the periods those occurrences fall into.  While the
+        file is still loading the recalculation waits for the load to end,
+        so showing a month at startup doesn't block on the whole history.
+        """
+        if self._recurring_window is None:
+            missing = [(start_date_str, end_date_str)]
+            window = (start_date_str, end_date_str)
+        else:
+            lo, hi = self._recurring_window
+            missing = []
+            if start_date_str < lo:
+                missing.append((start_date_str, self._shift_date(lo, -1)))
+            if end_date_str > hi:
+                missing.append((self._shift_date(hi, 1), end_date_str))
+            window = (min(lo, start_date_str), max(hi, end_date_str))
+        self._recurring_window = window
+        if not self.data["recurring"]:
+            return
+        new_dates = []
+        for lo, hi in missing:
+            if lo > hi:
+                continue
+            generated = recurring.materialize(self.data["recurring"], lo, hi)
+            self._add_generated(generated)
+            new_dates.extend(generated)
+        if new_dates and self._loader is not None:
+            self._deferred_dates.update(new_dates)
+            self._emit()
+        elif new_dates:
+            self._recalculate_dates(new_dates)
+            self._emit()
+
+    def _rematerialize_recurring(self):
+        """Regenerate the current window after the rules changed"""
+        changed = set(self._generated)
+        self._drop_generated()
+        if self._recurring_window is not None and self.data["recurring"]:
+            generated = recurring.materialize(self.data["recurring"], *self._recurring_window)
+            self._add_generated(generated)
+            changed.update(generated)
+        self._recalculate_dates(changed)
+
+    def _add_generated(self, generated):
+        for date_str, txs in generated.items():
+            self._generated.setdefault(date_str, []).extend(txs)
+            self._pending.transactions.add(date_str)
+            for t in txs:
+                if t["type"] == "expense":
+                    self.categories.add(date_str, t["category"], t["amount"])
+
+    def _drop_generated(self):
+        for date_str, txs in self._generated.items():
+            self._pending.transactions.add(date_str)
+            for t in txs:
+                if t["type"] == "expense":
+                    self.categories.remove(date_str, t["category"], t["amount"])
+        self._generated = {}
+
+    def _recalculate_dates(self, dates):
+        """Recalculate every period containing one of `dates`, each period once"""
+        income_dates = self._income_dates()
+        pending = set(dates)
+        # a payday appearing/disappearing also changes the period right before it
+        pending.update(self._shift_date(d, -1) for d in dates)
+        # compacted periods are recomputed from compacted_basis, never stored again
+        # (the watermark itself can be the payday starting the next period)
+        compacted = self.data.get("compacted_through") or ""
+        pending = {d for d in pending if d > compacted or (d == compacted and d in income_dates)}
+        covered_until = None
+        for date_str in sorted(pending):
+            if covered_until is not None and date_str < covered_until:
+                continue
+            self._recalculate_daily_limits(date_str)
+            later = [d for d in income_dates if d > date_str]
+            covered_until = later[0] if later else "9999-12-31"
+
+    @staticmethod
+    def _shift_date(date_str, days):
+        date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        return (date + datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+
+    def get_recurring_for_date(self, date_str):
+        """Occurrences generated by recurring rules for a date (materialized window only)"""
+        return self._generated.get(date_str, [])
+
+    def _all_transactions_for_date(self, date_str):
+        self._ensure_loaded(date_str)
+        return self.data["transactions"].get(date_str, []) + self._generated.get(date_str, [])
+
+    def _income_dates(self):
+        """Sorted dates holding income, real or generated"""
+        self.wait_loaded()
+        dates = {d for d, txs in self.data["transactions"].items()
+                 if any(t["type"] == "income" for t in txs)}
+        dates.update(d for d, txs in self._generated.items()
+                     if any(t["type"] == "income" for t in txs))
+        return sorted(dates)
+
+    def get_category_budgets(self):
+        """Get the configured daily budgets per category"""
+        return dict(self.data["settings"].get("category_budgets", {}))
+
+    def get_category_totals(self, start_date_str, end_date_str=None):
+        """Expense totals per category for a date range (inclusive), from the index"""
+        self._ensure_loaded(start_date_str)
+        return self.categories.range_totals(start_date_str, end_date_str or start_date_str)
+
     def get_payday_income(self, date_str):
         """Get total income for a specific payday"""
-        if date_str not in self.data["transactions"]:
-            return 0
-
-        return sum(t["amount"] for t in self.data["transactions"][date_str]
+        return sum(t["amount"] for t in self._all_transactions_for_date(date_str)
                   if t["type"] == "income")
 
     def get_daily_expenses(self, date_str):
         """Get total expenses for a specific day"""
-        if date_str not in self.data["transactions"]:
-            return 0
-
-        return sum(t["amount"] for t in self.data["transactions"][date_str]
+        return sum(t["amount"] for t in self._all_transactions_for_date(date_str)
                   if t["type"] == "expense")
 
+    def get_counted_expenses(self, date_str):
+        """
+        Expenses that count against the daily limit.  Spending in a budgeted
+        category is covered by its budget, only the overrun is counted.
+        """
+        budgets = self.data["settings"].get("category_budgets", {})
+        if not budgets:
+            return self.get_daily_expenses(date_str)
+        self._ensure_loaded(date_str)
+        counted = 0
+        for category, spent in self.categories.day_totals(date_str).items():
+            if category in budgets:
+                counted += max(0, spent - budgets[category])
+            else:
+                counted += spent
+        return counted
+
+    def get_range_summary(self, start_date_str, end_date_str):
+        """
+        (date, limit, spent, counted) for every day from start to end
+        (inclusive) in one pass over the stored limits and the category index.
+        """
+        self._ensure_loaded(start_date_str)
+        limits = self.data["daily_limits"]
+        compacted = self.data.get("compacted_through") or ""
+        budgets = self.data["settings"].get("category_budgets", {})
+        day = datetime.datetime.strptime(start_date_str, "%Y-%m-%d").date()
+        end = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
+        summary = []
+        while day <= end:
+            date_str = day.strftime("%Y-%m-%d")
+            spent = self.categories.day_total(date_str)
+            counted = self.get_counted_expenses(date_str) if budgets else spent
+            limit = self.get_daily_limit(date_str) if date_str <= compacted else limits.get(date_str, 0)
+            summary.append((date_str, limit, spent, counted))
+            day += datetime.timedelta(days=1)
+        return summary
+
     def get_daily_limit(self, date_str):
         """Get calculated daily limit for a specific day"""
         if date_str in self.data["daily_limits"]:
             return self.data["daily_limits"][date_str]
+        compacted = self.data.get("compacted_through")
+        if compacted and date_str <= compacted:
+            if date_str not in self._recomputed_limits:
+                self._recompute_compacted(date_str)
+            return self._recomputed_limits[date_str] or 0
         return 0
 
+    def get_surplus_adjustment(self, date_str):
+        """Surplus adjustment applied to a day (compacted days included)"""
+        compacted = self.data.get("compacted_through")
+        if (compacted and date_str <= compacted and date_str not in self.data["surplus_adjustments"]
+                and date_str not in self.data["daily_limits"]):  # a period compact() kept stays as stored
+            self.get_daily_limit(date_str)
+            return self._recomputed_adjustments.get(date_str, 0)
+        return self.data["surplus_adjustments"].get(date_str, 0)
+
+    def has_daily_limit(self, date_str):
+        """Whether a limit was calculated for the day (compacted days included)"""
+        if date_str in self.data["daily_limits"]:
+            return True
+        compacted = self.data.get("compacted_through")
+        if compacted and date_str <= compacted:
+            self.get_daily_limit(date_str)
+            return self._recomputed_limits[date_str] is not None
+        return False
+
+    # --- retention / compaction ---
+
+    def _stored_periods(self):
+        """
+        _periods() over the stored data, with paydays of recurring income
+        rules included even where they are not materialized yet
+        """
+        stored = list(self.data["daily_limits"]) + list(self.data["surplus_adjustments"])
+        income_rules = [r for r in self.data["recurring"] if r["type"] == "income"]
+        if not stored or not income_rules:
+            return list(self._periods())
+        lo = self._shift_date(min(stored), -62)
+        hi = max(stored)
+        saved = self._generated
+        merged = dict(saved)
+        for d, txs in recurring.materialize(income_rules, lo, hi).items():
+            present = {t["recurring_id"] for t in saved.get(d, [])}
+            merged[d] = saved.get(d, []) + [t for t in txs if t["recurring_id"] not in present]
+        self._generated = merged
+        try:
+            return list(self._periods())
+        finally:
+            self._generated = saved
+
+    def _periods(self):
+        """
+        (payday, last limit day, last adjustment day) of every period, the
+        same ranges _recalculate_daily_limits writes limits/adjustments to
+        """
+        income_dates = self._income_dates()
+        spread = self.data["settings"].get("surplus_distribution_days", 4)
+        for i, payday in enumerate(income_dates):
+            next_payday = income_dates[i + 1] if i + 1 < len(income_dates) else None
+            days = self._get_days_in_period(payday, next_payday)
+            last_limit = self._shift_date(payday, days)
+            last_adjustment = self._shift_date(payday, days + spread)
+            if next_payday:
+                last_limit = min(last_limit, next_payday)
+                last_adjustment = min(last_adjustment, self._shift_date(next_payday, -1))
+            yield payday, last_limit, last_adjustment
+
+    def compact(self, retention_days=365, measure=True):
+        """
+        Drop stored entries that no period needs any more:
+
+        * zero surplus adjustments
+        * limits / adjustments outside every pay period (orphans left behind
+          by deleted or edited incomes and by month-long fallback periods)
+        * limits / adjustments of periods that ended more than
+          `retention_days` ago; those are recomputed on demand when read.
+          A period is only dropped if recompute_period() gives back exactly
+          what is stored, using the settings and rules of the first
+          compaction (compacted_basis), so later changes don't rewrite it.
+
+        With `measure` the data is saved and a report of the bytes reclaimed
+        and the JSON parse time before/after is returned.
+        """
+        self.wait_loaded()
+        limits = self.data["daily_limits"]
+        adjustments = self.data["surplus_adjustments"]
+        before_text = json.dumps(self.data, indent=2) if measure else None
+
+        cutoff = (datetime.date.today() - datetime.timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        compacted_through = self.data.get("compacted_through")
+        basis = self.data.get("compacted_basis") or {
+            "settings": copy.deepcopy(self.data["settings"]),
+            "recurring": copy.deepcopy(self.data["recurring"]),
+        }
+        periods = self._stored_periods()
+        limit_keys, adjustment_keys = sorted(limits), sorted(adjustments)
+        index = transaction_index(self.data["transactions"])
+        kept = []
+        for i, period in enumerate(periods):
+            next_payday = periods[i + 1][0] if i + 1 < len(periods) else None
+            if (period[2] >= cutoff
+                    or not self._reproducible(period, next_payday, basis, limit_keys, adjustment_keys, index)):
+                kept.append(period)
+            else:
+                compacted_through = max(compacted_through or period[1], period[1])
+        paydays = [p[0] for p in kept]
+
+        def in_period(date_str, last_index, inclusive_start):
+            # periods don't overlap, so only the one starting last before date_str can hold it
+            i = (bisect.bisect_right if inclusive_start else bisect.bisect_left)(paydays, date_str) - 1
+            return i >= 0 and date_str <= kept[i][last_index]
+
+        drop_limits = [k for k in limits if not in_period(k, 1, False)]
+        drop_adjustments = [k for k, v in adjustments.items()
+                            if abs(v) < 1e-9 or not in_period(k, 2, True)]
+        for k in drop_limits:
+            del limits[k]
+        for k in drop_adjustments:
+            del adjustments[k]
+        self.data["compacted_through"] = compacted_through
+        if compacted_through is not None:
+            self.data["compacted_basis"] = basis
+        self._recomputed_limits.clear()
+        self._recomputed_adjustments.clear()
+        self._publish(full=True)
+
+        report = {"limits_removed": len(drop_limits), "adjustments_removed": len(drop_adjustments)}
+        if measure:
+            after_text = json.dumps(self.data, indent=2)
+            report.update({
+                "bytes_before": len(before_text.encode("utf-8")),
+                "bytes_after": len(after_text.encode("utf-8")),
+                "load_seconds_before": self._time_parse(before_text),
+                "load_seconds_after": self._time_parse(after_text),
+            })
+            report["bytes_reclaimed"] = report["bytes_before"] - report["bytes_after"]
+            self.save_data()
+        return report
+
+    def _reproducible(self, period, next_payday, basis, limit_keys, adjustment_keys, index):
+        """Whether recompute_period() with `basis` gives back the stored entries of a period"""
+        payday, last_limit, last_adjustment = period
+        if next_payday is not None and last_limit >= next_payday:
+            last_limit = self._shift_date(next_payday, -1)  # the payday's limit belongs to its own period
+        limits, adjustments = self.data["daily_limits"], self.data["surplus_adjustments"]
+        first_limit = self._shift_date(payday, 1)
+        stored_limits = {k: limits[k] for k in _between(limit_keys, first_limit, last_limit)}
+        stored_adjustments = {k: adjustments[k] for k in _between(adjustment_keys, payday, last_adjustment)
+                              if abs(adjustments[k]) >= 1e-9}
+        if not stored_limits and not stored_adjustments:
+            return True  # nothing to lose
+        new_limits, new_adjustments = recompute_period(basis["settings"], basis["recurring"],
+                                                       self.data["transactions"], payday, index)
+        new_limits = {k: v for k, v in new_limits.items() if first_limit <= k <= last_limit}
+        new_adjustments = {k: v for k, v in new_adjustments.items()
+                           if payday <= k <= last_adjustment and abs(v) >= 1e-9}
+        return all(stored.keys() == new.keys() and all(abs(stored[k] - new[k]) < 1e-6 for k in stored)
+                   for stored, new in ((stored_limits, new_limits), (stored_adjustments, new_adjustments)))
+
+    @staticmethod
+    def _time_parse(text, repeat=3):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            json.loads(text)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _recompute_compacted(self, date_str):
+        """
+        Recalculate a compacted period into memory without touching the
+        saved data.  Recurring occurrences are generated for the period
+        whether or not they are materialized, as compact() saw them.
+        """
+        self.wait_loaded()
+        compacted = self.data["compacted_through"]
+        basis = self.data.get("compacted_basis") or self.data
+        limits, adjustments = recompute_period(basis["settings"], basis["recurring"],
+                                               self.data["transactions"], date_str)
+        for section, target in ((limits, self._recomputed_limits),
+                                (adjustments, self._recomputed_adjustments)):
+            target.update((k, v) for k, v in section.items() if k <= compacted)
+        # remember days without a limit too (None), so they aren't recomputed on every read
+        self._recomputed_limits.setdefault(date_str, None)
+
     def _get_days_in_period(self, start_date_str: str, end_date_str: str | None = None) -> int:
         """
         If a *fixed* daily limit is active → return how many whole days the
@@ -183,10 +899,12 @@ class FinancialTracker:
     def _calculate_initial_daily_limit(self, payday_date_str, days_in_period):
         """Calculate initial daily limit based on income, period, and savings goal"""
         total_income = self.get_payday_income(payday_date_str)
+        # Category budgets are reserved out of every day's limit
+        reserved = sum(self.data["settings"].get("category_budgets", {}).values())
 
         if self.data["settings"]["fixed_daily_limit"] is not None:
             # If fixed daily limit is set, use that
-            return self.data["settings"]["fixed_daily_limit"]
+            return max(0, self.data["settings"]["fixed_daily_limit"] - reserved)
 
         # Calculate savings amount
         savings_percentage = self.data["settings"]["savings_percentage"]
@@ -197,7 +915,7 @@ class FinancialTracker:
 
         # Calculate daily limit
         if days_in_period > 0:
-            daily_limit = available_amount / days_in_period
+            daily_limit = max(0, available_amount / days_in_period - reserved)
         else:
             daily_limit = 0
 
@@ -212,13 +930,11 @@ class FinancialTracker:
         start_date = datetime.datetime.strptime(start_date_str, "%Y-%m-%d").date()
         payday_date_str = None
 
-        # Find all dates with income transactions
-        income_dates = [date_str for date_str in self.data["transactions"]
-                       if any(t["type"] == "income" for t in self.data["transactions"][date_str])]
+        # Find all dates with income transactions (generated paydays included)
+        income_dates = self._income_dates()
 
-        # Sort dates and find the most recent payday
+        # Find the most recent payday
         if income_dates:
-            income_dates.sort()
             for date_str in income_dates:
                 date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
                 if date <= start_date:
@@ -246,11 +962,12 @@ class FinancialTracker:
         temp_date = datetime.datetime.strptime(payday_date_str, "%Y-%m-%d").date()
         end_recalc_date = temp_date + datetime.timedelta(days=days_in_period) if days_in_period else None
         keys_to_delete_limits = [k for k in self.data["daily_limits"] if k >= payday_date_str and (end_recalc_date is None or k < end_recalc_date.strftime("%Y-%m-%d"))]
-        for k in keys_to_delete_limits:
-            del self.data["daily_limits"][k]
+        # Remember what was there so the change event only lists real differences
+        old_limits = {k: self.data["daily_limits"].pop(k) for k in keys_to_delete_limits}
         keys_to_delete_surplus = [k for k in self.data["surplus_adjustments"] if k >= payday_date_str and (end_recalc_date is None or k < end_recalc_date.strftime("%Y-%m-%d"))]
-        for k in keys_to_delete_surplus:
-            del self.data["surplus_adjustments"][k]
+        old_adjustments = {k: self.data["surplus_adjustments"].pop(k) for k in keys_to_delete_surplus}
+        written_limits = []
+        written_adjustments = set()
 
         # Generate all dates in the period
         current_date = (datetime.datetime.strptime(payday_date_str, "%Y-%m-%d").date()
@@ -267,11 +984,14 @@ class FinancialTracker:
             today_adjustment = self.data["surplus_adjustments"].get(current_date_str, 0)
             adjusted_initial_limit = initial_daily_limit + today_adjustment
 
-            # Get expenses for the current day
-            daily_expenses = self.get_daily_expenses(current_date_str)
+            # Get expenses for the current day (budgeted categories only count their overrun)
+            daily_expenses = self.get_counted_expenses(current_date_str)
 
             # Store the daily limit for this day
+            if current_date_str in self.data["daily_limits"] and current_date_str not in old_limits:
+                old_limits[current_date_str] = self.data["daily_limits"][current_date_str]
             self.data["daily_limits"][current_date_str] = running_limit
+            written_limits.append(current_date_str)
 
             # Calculate rollover/deficit for the next day
             if daily_expenses <= running_limit:
@@ -290,7 +1010,10 @@ class FinancialTracker:
                         # Stop distributing if we hit the next payday
                         if next_payday_date_str and future_date_str >= next_payday_date_str:
                             break
+                        if future_date_str in self.data["surplus_adjustments"] and future_date_str not in written_adjustments:
+                            old_adjustments.setdefault(future_date_str, self.data["surplus_adjustments"][future_date_str])
                         self.data["surplus_adjustments"][future_date_str] = self.data["surplus_adjustments"].get(future_date_str, 0) - adjustment_per_day
+                        written_adjustments.add(future_date_str)
                     # Next day's limit starts from the adjusted initial limit (without deficit reduction)
                     running_limit = adjusted_initial_limit
                 else:
@@ -306,31 +1029,56 @@ class FinancialTracker:
             if next_payday_date_str and current_date_str >= next_payday_date_str:
                 break
 
+        if self._journal is not None:
+            for section, old, written in (("daily_limits", old_limits, written_limits),
+                                          ("surplus_adjustments", old_adjustments, written_adjustments)):
+                for k in set(old).union(written):
+                    self._journal[section].setdefault(k, old.get(k))
+        self._note_diff(self._pending.limits, old_limits, written_limits, self.data["daily_limits"])
+        self._note_diff(self._pending.adjustments, old_adjustments, written_adjustments,
+                        self.data["surplus_adjustments"])
+
+    @staticmethod
+    def _note_diff(changed, old, written, current):
+        for k in set(old).union(written):
+            if k not in current or k not in old or abs(current[k] - old[k]) > 1e-9:
+                changed.add(k)
+
     def _recalculate_all_daily_limits(self):
         """Recalculate all daily limits from the earliest payday"""
-        # Find all dates with income transactions
-        income_dates = [date_str for date_str in self.data["transactions"]
-                       if any(t["type"] == "income" for t in self.data["transactions"][date_str])]
+        # Find all dates with income transactions (compacted periods keep their compacted_basis)
+        compacted = self.data.get("compacted_through") or ""
+        income_dates = [d for d in self._income_dates() if d >= compacted]
 
         if income_dates:
-            # Sort dates and start recalculation from the earliest payday
-            income_dates.sort()
+            # Start recalculation from the earliest payday
             self._recalculate_daily_limits(income_dates[0])
 
     def get_transactions_for_date(self, date_str):
         """Get all transactions for a specific date"""
+        self._ensure_loaded(date_str)
         if date_str in self.data["transactions"]:
             return self.data["transactions"][date_str]
         return []
 
     def get_balance_summary(self):
         """Get summary of current financial status"""
+        self.wait_loaded()
         total_income = sum(t["amount"] for date_str in self.data["transactions"]
                           for t in self.data["transactions"][date_str] if t["type"] == "income")
 
         total_expenses = sum(t["amount"] for date_str in self.data["transactions"]
                             for t in self.data["transactions"][date_str] if t["type"] == "expense")
 
+        # Recurring occurrences up to today count like real transactions
+        today_str = datetime.date.today().strftime("%Y-%m-%d")
+        for rule in self.data["recurring"]:
+            total = rule["amount"] * sum(1 for _ in recurring.occurrences(rule, rule["start"], today_str))
+            if rule["type"] == "income":
+                total_income += total
+            else:
+                total_expenses += total
+
         savings_percentage = self.data["settings"]["savings_percentage"]
         savings_amount = total_income * (savings_percentage / 100)
 
@@ -1,11 +1,18 @@
+import time
+_STARTED = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox
 import datetime
-from calendar import monthrange
 from logic import FinancialTracker
-from tr_dialog import EditTransactionDialog
+from tx_view import VirtualTransactionList
+from viewcache import MonthViewCache, adjacent_months
 import os
 import sys # Import sys module
+# Dialogs, export, the year view and the forecast are imported on first use
+
+LOAD_POLL_MS = 30  # how often batches of a background load are merged
+
 
 class FinancialTrackerApp:
     def __init__(self, root):
@@ -23,7 +30,8 @@ class FinancialTrackerApp:
 
         data_file_path = os.path.join(base_path, "data.json")
         print(f"Data file path: {data_file_path}") # Add print for debugging
-        self.tracker = FinancialTracker(data_file=data_file_path)
+        # Older history is parsed in the background while the window is up
+        self.tracker = FinancialTracker(data_file=data_file_path, background_load=True)
 
         self.selected_date = datetime.date.today()
         self.current_display_month = self.selected_date.month
@@ -34,14 +42,46 @@ class FinancialTrackerApp:
         self.surplus_enabled_var = tk.BooleanVar(value=self.tracker.data["settings"].get("surplus_enabled", False))
         self.surplus_days_var = tk.StringVar(value=str(self.tracker.data["settings"].get("surplus_distribution_days", 4)))
 
+        self._day_buttons = {}  # date_str: calendar button of the shown month
+        self._heatmap = None    # year view canvas while its window is open
+        self.month_cache = MonthViewCache(self.tracker)
+        self._prefetch_job = None
+        self.first_paint_at = None
         self.create_widgets()
         self.update_calendar()
         self.update_details_for_date(self.selected_date)
+        # The settings panels and the prefetch aren't needed for the first paint
+        self._expose_binding = self.root.bind("<Expose>", self._on_first_expose, "+")
+        self.tracker.subscribe(self._on_tracker_change)
+        if self.tracker.is_loading:
+            self.root.after(LOAD_POLL_MS, self._poll_loading)
+
+        # Undo / redo
+        self.root.bind_all("<Control-z>", lambda e: self.undo())
+        self.root.bind_all("<Control-y>", lambda e: self.redo())
 
         # Save data on closing the window
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def create_widgets(self):
+        # Menu bar
+        menubar = tk.Menu(self.root)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Export Transactions…", command=lambda: self.export_data("transactions"))
+        file_menu.add_command(label="Export Daily Limits…", command=lambda: self.export_data("daily_limits"))
+        file_menu.add_command(label="Export Category Rollups…", command=lambda: self.export_data("rollups"))
+        menubar.add_cascade(label="File", menu=file_menu)
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        menubar.add_cascade(label="Edit", menu=edit_menu)
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="Year View…", command=self.show_year_view)
+        tools_menu.add_command(label="Forecast 12 Months…", command=self.show_forecast)
+        tools_menu.add_command(label="Compact Data", command=self.compact_data)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        self.root.config(menu=menubar)
+
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -88,9 +128,22 @@ class FinancialTrackerApp:
         transactions_frame = ttk.LabelFrame(right_frame, text="Transactions", padding="10")
         transactions_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
 
-        self.transactions_list = tk.Listbox(transactions_frame, height=6)
+        sort_frame = ttk.Frame(transactions_frame)
+        sort_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(sort_frame, text="Sort:").pack(side=tk.LEFT)
+        self.tx_sort_var = tk.StringVar(value="entry")
+        sort_box = ttk.Combobox(sort_frame, textvariable=self.tx_sort_var, width=8, state="readonly",
+                                values=("entry", "amount", "time"))
+        sort_box.pack(side=tk.LEFT, padx=5)
+        sort_box.bind("<<ComboboxSelected>>", lambda e: self._sort_transactions())
+        self.tx_sort_desc_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(sort_frame, text="Descending", variable=self.tx_sort_desc_var,
+                        command=self._sort_transactions).pack(side=tk.LEFT)
+
+        # Only the visible rows are formatted and put into the widget
+        self.transactions_list = VirtualTransactionList(transactions_frame, height=6)
         self.transactions_list.pack(fill=tk.BOTH, expand=True)
-        self.transactions_list.bind("<Button-3>", self._tx_context)
+        self.transactions_list.bind_context(self._tx_context)
 
         # --- Input Widgets (Right Frame) ---
         input_frame = ttk.LabelFrame(right_frame, text="Add Transaction", padding="10")
@@ -104,9 +157,39 @@ class FinancialTrackerApp:
         self.desc_entry = ttk.Entry(input_frame, width=15)
         self.desc_entry.grid(row=1, column=1, columnspan=2, padx=5, pady=5, sticky="ew")
 
+        ttk.Label(input_frame, text="Category:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.category_entry = ttk.Combobox(input_frame, width=13, values=self.tracker.categories.categories())
+        self.category_entry.grid(row=2, column=1, columnspan=2, padx=5, pady=5, sticky="ew")
+
+        ttk.Label(input_frame, text="Repeat:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
+        self.repeat_var = tk.StringVar(value="never")
+        ttk.Combobox(input_frame, textvariable=self.repeat_var, width=10, state="readonly",
+                     values=("never", "daily", "weekly", "monthly")).grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
         ttk.Button(input_frame, text="Add Income", command=self.add_income).grid(row=0, column=2, padx=5, pady=5)
         ttk.Button(input_frame, text="Add Expense", command=self.add_expense).grid(row=0, column=3, padx=5, pady=5)
 
+        # Settings panels are filled in by _create_settings_widgets once the window is up
+        self._settings_frame = ttk.Frame(right_frame)
+        self._settings_frame.pack(fill=tk.X)
+        self._settings_built = False
+
+    def _on_first_expose(self, event):
+        # the window is on screen; its redraw runs in the idle handlers queued before ours
+        self.root.unbind("<Expose>", self._expose_binding)
+        self.root.after_idle(self._on_first_idle)
+
+    def _on_first_idle(self):
+        self.first_paint_at = time.perf_counter()
+        self._schedule_prefetch()
+        self._create_settings_widgets()
+
+    def _create_settings_widgets(self):
+        if self._settings_built:
+            return
+        self._settings_built = True
+        right_frame = self._settings_frame
+
         # --- Savings/Limit Settings Widgets (Right Frame) ---
         savings_settings_frame = ttk.LabelFrame(right_frame, text="Savings/Limit Settings", padding="10")
         savings_settings_frame.pack(fill=tk.X, pady=(0, 10))
@@ -138,6 +221,17 @@ class FinancialTrackerApp:
         self.surplus_days_entry.grid(row=1, column=1, sticky="w", padx=5, pady=2)
         ttk.Button(surplus_settings_frame, text="Save Surplus Settings", command=self.save_surplus_settings).grid(row=0, column=2, rowspan=2, padx=5, pady=5)
 
+        # --- Category Budget Widgets (Right Frame) ---
+        budget_settings_frame = ttk.LabelFrame(right_frame, text="Category Budgets (per day)", padding="10")
+        budget_settings_frame.pack(fill=tk.X, pady=(0, 10))
+
+        self.budget_category_entry = ttk.Combobox(budget_settings_frame, width=13,
+                                                  values=self._budget_category_choices())
+        self.budget_category_entry.grid(row=0, column=0, padx=5, pady=2)
+        self.budget_value_entry = ttk.Entry(budget_settings_frame, width=8)
+        self.budget_value_entry.grid(row=0, column=1, padx=5, pady=2)
+        ttk.Button(budget_settings_frame, text="Save Budget", command=self.save_category_budget).grid(row=0, column=2, padx=5, pady=2)
+
         # --- Display Settings Widgets (Right Frame) ---
         display_settings_frame = ttk.LabelFrame(right_frame, text="Calendar Display Settings", padding="10")
         display_settings_frame.pack(fill=tk.X)
@@ -167,9 +261,6 @@ class FinancialTrackerApp:
                 else:
                     messagebox.showerror("Error", "Fixed limit must be non-negative.")
                     return
-            # Recalculate and update display for the currently selected date
-            self.update_details_for_date(self.selected_date)
-            self.update_calendar() # Update calendar as limits might change
         except ValueError:
             messagebox.showerror("Error", "Invalid input for settings value. Please enter a number.")
         except Exception as e:
@@ -185,20 +276,48 @@ class FinancialTrackerApp:
 
             self.tracker.set_surplus_settings(enabled, days)
             messagebox.showinfo("Settings Saved", f"Surplus distribution settings saved (Enabled: {enabled}, Days: {days})")
-            # Recalculate and update display
-            self.update_details_for_date(self.selected_date)
-            self.update_calendar()
         except ValueError:
             messagebox.showerror("Error", "Invalid input for distribution days. Please enter a whole number.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save surplus settings: {e}")
 
+    def _budget_category_choices(self):
+        return sorted(set(self.tracker.categories.categories()) | set(self.tracker.get_category_budgets()))
+
+    def save_category_budget(self):
+        category = self.budget_category_entry.get().strip()
+        if not category:
+            messagebox.showerror("Error", "Enter a category name.")
+            return
+        try:
+            value = self.budget_value_entry.get().strip()
+            budget = float(value) if value else 0
+            if budget < 0:
+                messagebox.showerror("Error", "Budget must be non-negative.")
+                return
+            self.tracker.set_category_budget(category, budget)
+            if budget:
+                messagebox.showinfo("Settings Saved", f"Daily budget for '{category}' set to ${budget:.2f}")
+            else:
+                messagebox.showinfo("Settings Saved", f"Daily budget for '{category}' removed")
+            self.budget_category_entry.config(values=self._budget_category_choices())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid budget. Please enter a number.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save budget: {e}")
+
     def update_calendar(self):
         # Clear previous calendar
         for widget in self.calendar_frame.winfo_children():
             widget.destroy()
+        self._day_buttons = {}
 
-        self.month_year_label.config(text=datetime.date(self.current_display_year, self.current_display_month, 1).strftime("%B %Y"))
+        year, month = self.current_display_year, self.current_display_month
+        self.month_year_label.config(text=datetime.date(year, month, 1).strftime("%B %Y"))
+
+        # Computed cells come from the month cache; prev/next are prefetched when idle
+        self._ensure_month_window(year, month)
+        view = self.month_cache.get(year, month, self.calendar_display_mode.get())
 
         # Add day headers
         days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
@@ -206,9 +325,8 @@ class FinancialTrackerApp:
             ttk.Label(self.calendar_frame, text=day, width=3, anchor="center").grid(row=0, column=i, padx=1, pady=1)
 
         # Get calendar data
-        month_cal = monthrange(self.current_display_year, self.current_display_month)
-        first_day_weekday = month_cal[0] # 0 = Monday, 6 = Sunday
-        days_in_month = month_cal[1]
+        first_day_weekday = view.first_weekday # 0 = Monday, 6 = Sunday
+        days_in_month = len(view.cells)
 
         current_day = 1
         for week in range(6): # Max 6 weeks needed
@@ -218,32 +336,14 @@ class FinancialTrackerApp:
                     ttk.Label(self.calendar_frame, text="").grid(row=week + 1, column=day_of_week, padx=1, pady=1)
                 elif current_day <= days_in_month:
                     # Create button for the day
-                    date_obj = datetime.date(self.current_display_year, self.current_display_month, current_day)
-                    date_str = date_obj.strftime("%Y-%m-%d")
-                    limit = self.tracker.get_daily_limit(date_str)
-                    expenses = self.tracker.get_daily_expenses(date_str)
-                    remaining = limit - expenses
-
-                    # Determine button text based on display mode
-                    display_text = str(current_day)
-                    if self.calendar_display_mode.get() == "show_remaining":
-                        display_text = f"{remaining:.0f}"
-                    elif self.calendar_display_mode.get() == "show_spent":
-                        display_text = f"{expenses:.0f}"
-
-                    # Determine button style
-                    style = "TButton"
-                    if date_obj == self.selected_date:
-                        style = "Selected.TButton"
-                    elif expenses > limit and limit > 0: # Exceeded limit (and limit was positive)
-                        style = "Exceeded.TButton"
-                    elif limit > 0:
-                        style = "HasLimit.TButton"
+                    date_obj = datetime.date(year, month, current_day)
+                    display_text, style = self._day_cell(date_obj)
 
                     # Make button smaller (width=3)
                     btn = ttk.Button(self.calendar_frame, text=display_text, width=3,
                                      command=lambda d=date_obj: self.select_date(d), style=style)
                     btn.grid(row=week + 1, column=day_of_week, padx=1, pady=1, sticky="nsew")
+                    self._day_buttons[date_obj.strftime("%Y-%m-%d")] = btn
                     current_day += 1
                 else:
                     # Empty cell after the last day
@@ -257,10 +357,71 @@ class FinancialTrackerApp:
         style.configure("HasLimit.TButton", foreground="blue") # Indicate days with calculated limits
         style.configure("Exceeded.TButton", foreground="red") # Indicate days where limit was exceeded
 
+        self._schedule_prefetch()
+
+    def _ensure_month_window(self, year, month):
+        """Generate recurring occurrences for a month plus a period on each side"""
+        month_start = datetime.date(year, month, 1)
+        self.tracker.ensure_recurring_window(
+            (month_start - datetime.timedelta(days=31)).strftime("%Y-%m-%d"),
+            (month_start + datetime.timedelta(days=62)).strftime("%Y-%m-%d")
+        )
+
+    def _schedule_prefetch(self):
+        if self.first_paint_at is None:
+            return  # _on_first_idle schedules it once the window is drawn
+        if self._prefetch_job is not None:
+            self.root.after_cancel(self._prefetch_job)
+        self._prefetch_job = self.root.after_idle(self._prefetch_adjacent)
+
+    def _prefetch_adjacent(self):
+        """Fill the cache for the previous and next month while the UI is idle"""
+        self._prefetch_job = None
+        mode = self.calendar_display_mode.get()
+        for year, month in adjacent_months(self.current_display_year, self.current_display_month):
+            if (year, month, mode) not in self.month_cache:
+                self._ensure_month_window(year, month)
+                self.month_cache.get(year, month, mode)
+
+    def _day_cell(self, date_obj):
+        """Text and style of one calendar button"""
+        view = self.month_cache.get(date_obj.year, date_obj.month, self.calendar_display_mode.get())
+        display_text, style = view.cells[date_obj.strftime("%Y-%m-%d")]
+        if date_obj == self.selected_date:
+            style = "Selected.TButton"
+        return display_text, style
+
+    def _refresh_day(self, date_str):
+        """Redraw a single calendar button, if it is on screen"""
+        btn = self._day_buttons.get(date_str)
+        if btn is not None:
+            display_text, style = self._day_cell(datetime.datetime.strptime(date_str, "%Y-%m-%d").date())
+            btn.config(text=display_text, style=style)
+
+    def _on_tracker_change(self, event):
+        """Redraw only the cells and labels the mutation touched"""
+        self.month_cache.invalidate(event)
+        for date_str in (self._day_buttons if event.settings else event.dates):
+            self._refresh_day(date_str)
+        if self._heatmap is not None:
+            self._heatmap.update_days(event.dates)
+        selected = self.selected_date.strftime("%Y-%m-%d")
+        if selected in event.dates:
+            self._update_day_labels(selected)
+        if selected in event.transactions:
+            self._update_transaction_list(selected)
+        if event.balance_changed:
+            self._update_balance()
+
     def select_date(self, date_obj):
+        previous = self.selected_date
         self.selected_date = date_obj
-        self.update_calendar() # Redraw to show selection
+        # Only the old and the new selection change style
+        self._refresh_day(previous.strftime("%Y-%m-%d"))
+        self._refresh_day(date_obj.strftime("%Y-%m-%d"))
         self.update_details_for_date(date_obj)
+        if self._heatmap is not None:
+            self._heatmap.select(date_obj.strftime("%Y-%m-%d"))
 
     def prev_month(self):
         if self.current_display_month == 1:
@@ -291,18 +452,23 @@ class FinancialTrackerApp:
                 messagebox.showerror("Error", "Amount must be positive.")
                 return
             description = self.desc_entry.get()
+            category = self.category_entry.get()
             date_str = self.selected_date.strftime("%Y-%m-%d")
 
-            self.tracker.add_transaction(date_str, amount, transaction_type, description)
+            if self.repeat_var.get() == "never":
+                self.tracker.add_transaction(date_str, amount, transaction_type, description, category)
+            else:
+                # Occurrences are generated from the rule, starting on the selected date
+                self.tracker.add_recurring_rule(date_str, amount, transaction_type,
+                                                self.repeat_var.get(), description, category)
+                self.repeat_var.set("never")
 
             # Clear input fields
             self.amount_entry.delete(0, tk.END)
             self.desc_entry.delete(0, tk.END)
-
-            # Update display
-            self.update_details_for_date(self.selected_date)
-            # Recalculate limits might affect future days, update calendar potentially
-            self.update_calendar()
+            self.category_entry.set("")
+            self.category_entry.config(values=self.tracker.categories.categories())
+            # The calendar and details refresh through _on_tracker_change
 
         except ValueError:
             messagebox.showerror("Error", "Invalid amount. Please enter a number.")
@@ -310,19 +476,33 @@ class FinancialTrackerApp:
             messagebox.showerror("Error", f"Failed to add transaction: {e}")
 
     def _tx_context(self, event):
-        sel = self.transactions_list.curselection()
-        if not sel: return
-        idx = sel[0]
+        idx = self.transactions_list.selected_index()  # index into real + generated rows
+        if idx is None: return
+        date_str = self.selected_date.strftime("%Y-%m-%d")
+        real = self.tracker.get_transactions_for_date(date_str)
+        generated = self.tracker.get_recurring_for_date(date_str)
         menu = tk.Menu(self.root, tearoff=0)
-        menu.add_command(label="Edit…", command=lambda: self._edit_tx(idx))
-        menu.add_command(label="Delete", command=lambda: self._del_tx(idx))
+        if idx < len(real):
+            menu.add_command(label="Edit…", command=lambda: self._edit_tx(idx))
+            menu.add_command(label="Delete", command=lambda: self._del_tx(idx))
+        elif idx < len(real) + len(generated):
+            rule_id = generated[idx - len(real)]["recurring_id"]
+            menu.add_command(label="Delete Recurring Rule", command=lambda: self._del_rule(rule_id))
+        else:
+            return
         menu.post(event.x_root, event.y_root)
 
+    def _del_rule(self, rule_id):
+        if not messagebox.askyesno("Delete Recurring Rule", "Remove this rule and all of its occurrences?"):
+            return
+        try:
+            self.tracker.remove_recurring_rule(rule_id)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+
     def _del_tx(self, idx):
         try:
             self.tracker.remove_transaction(self.selected_date.strftime("%Y-%m-%d"), idx)
-            self.update_details_for_date(self.selected_date)
-            self.update_calendar()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
 
@@ -330,7 +510,8 @@ class FinancialTrackerApp:
         date_str = self.selected_date.strftime("%Y-%m-%d")
         tx = self.tracker.get_transactions_for_date(date_str)[idx]
 
-        dlg = EditTransactionDialog(self.root, tx)
+        from tr_dialog import EditTransactionDialog
+        dlg = EditTransactionDialog(self.root, tx, categories=self.tracker.categories.categories())
         self.root.wait_window(dlg)
 
         if not dlg.result:    # cancelled
@@ -341,33 +522,170 @@ class FinancialTrackerApp:
             idx,
             amount=dlg.result["amount"],
             transaction_type=dlg.result["type"],
-            description=dlg.result["desc"]
+            description=dlg.result["desc"],
+            category=dlg.result["category"]
         )
+
+    def update_details_for_date(self, date_obj: datetime.date):
+        date_str = date_obj.strftime("%Y-%m-%d")
+        self._update_day_labels(date_str)
+        self._update_balance()
+        self._update_transaction_list(date_str)
+
+    def _update_day_labels(self, date_str):
+        self.selected_date_label.config(text=f"Date: {date_str}")
+
+        limit     = self.tracker.get_daily_limit(date_str)
+        spent     = self.tracker.get_daily_expenses(date_str)
+        remaining = limit - self.tracker.get_counted_expenses(date_str)
+
+        self.daily_limit_label.config(text=f"Daily Limit: ${limit:.2f}")
+        self.daily_spent_label.config(text=f"Spent Today: ${spent:.2f}")
+        self.daily_remaining_label.config(text=f"Remaining Today: ${remaining:.2f}")
+
+    def _poll_loading(self):
+        if self.tracker.load_step():
+            self.root.after(LOAD_POLL_MS, self._poll_loading)
+            return
+        # Everything is in: totals, categories and compacted limits may have changed
+        self.month_cache.clear()
+        self.update_calendar()
         self.update_details_for_date(self.selected_date)
+        self.category_entry.config(values=self.tracker.categories.categories())
+
+    def _update_balance(self):
+        if self.tracker.is_loading:
+            self.total_balance_label.config(text="Balance: loading…")
+            return
+        balance = self.tracker.get_balance_summary()["remaining_balance"]
+        self.total_balance_label.config(text=f"Balance: ${balance:.2f}")
+
+    def _update_transaction_list(self, date_str):
+        rows = self.tracker.get_transactions_for_date(date_str) + self.tracker.get_recurring_for_date(date_str)
+        self.transactions_list.set_rows(rows)
+
+    def _sort_transactions(self):
+        self.transactions_list.sort(self.tx_sort_var.get(), self.tx_sort_desc_var.get())
+
+    def undo(self):
+        if self.tracker.undo():
+            self._refresh_after_history()
+
+    def redo(self):
+        if self.tracker.redo():
+            self._refresh_after_history()
+
+    def _refresh_after_history(self):
+        """Settings may have been undone too, so resync their widgets"""
+        self._create_settings_widgets()
+        settings = self.tracker.data["settings"]
+        self.settings_value_entry.delete(0, tk.END)
+        if settings["fixed_daily_limit"] is not None:
+            self.settings_var.set("fixed")
+            self.settings_value_entry.insert(0, str(settings["fixed_daily_limit"]))
+        else:
+            self.settings_var.set("percentage")
+            self.settings_value_entry.insert(0, str(settings["savings_percentage"]))
+        self.surplus_enabled_var.set(settings.get("surplus_enabled", False))
+        self.surplus_days_var.set(str(settings.get("surplus_distribution_days", 4)))
+        self.budget_category_entry.config(values=self._budget_category_choices())
+        self.category_entry.config(values=self.tracker.categories.categories())
+
+    def show_year_view(self):
+        if self._heatmap is not None:
+            self._heatmap.winfo_toplevel().lift()
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Year View")
+        win.resizable(False, False)
+
+        nav = ttk.Frame(win, padding=(10, 10, 10, 0))
+        nav.pack(fill=tk.X)
+        year_label = ttk.Label(nav, width=8, anchor="center")
+        from heatmap import YearHeatmap
+        self._heatmap = YearHeatmap(win, self.tracker, on_select=self._select_from_year_view)
+
+        def show_year(year):
+            year_label.config(text=str(year))
+            year_label.year = year
+            # generate recurring occurrences for the whole year before the bulk query
+            self.tracker.ensure_recurring_window(f"{year - 1}-12-01", f"{year + 1}-01-31")
+            self._heatmap.show(datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+            self._heatmap.select(self.selected_date.strftime("%Y-%m-%d"))
+
+        ttk.Button(nav, text="<", width=3, command=lambda: show_year(year_label.year - 1)).pack(side=tk.LEFT)
+        year_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav, text=">", width=3, command=lambda: show_year(year_label.year + 1)).pack(side=tk.LEFT)
+        self._heatmap.pack(padx=10, pady=10)
+        show_year(self.current_display_year)
+
+        def on_close():
+            self._heatmap = None
+            win.destroy()
+        win.protocol("WM_DELETE_WINDOW", on_close)
+
+    def _select_from_year_view(self, date_obj):
+        if (date_obj.year, date_obj.month) != (self.current_display_year, self.current_display_month):
+            self.current_display_year, self.current_display_month = date_obj.year, date_obj.month
+            self.selected_date = date_obj
+            self.update_calendar()
+            self.update_details_for_date(date_obj)
+        else:
+            self.select_date(date_obj)
+
+    def compact_data(self):
+        try:
+            report = self.tracker.compact()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to compact data: {e}")
+            return
+        self.month_cache.clear()
         self.update_calendar()
+        messagebox.showinfo(
+            "Compact Data",
+            f"Removed {report['limits_removed']} daily limits and "
+            f"{report['adjustments_removed']} surplus adjustments.\n"
+            f"Reclaimed {report['bytes_reclaimed'] / 1024:.1f} KB "
+            f"({report['bytes_before'] / 1024:.1f} KB → {report['bytes_after'] / 1024:.1f} KB).\n"
+            f"Load time: {report['load_seconds_before'] * 1000:.1f} ms → "
+            f"{report['load_seconds_after'] * 1000:.1f} ms")
+
+    def show_forecast(self):
+        try:
+            import forecast
+            result = forecast.forecast(self.tracker, months=12)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to forecast: {e}")
+            return
 
-    def update_details_for_date(self, date_obj: datetime.date):
-            date_str = date_obj.strftime("%Y-%m-%d")
-            self.selected_date_label.config(text=f"Date: {date_str}")
-
-            limit     = self.tracker.get_daily_limit(date_str)
-            spent     = self.tracker.get_daily_expenses(date_str)
-            remaining = limit - spent
-            balance   = self.tracker.get_balance_summary()["remaining_balance"]
-
-            self.daily_limit_label.config(text=f"Daily Limit: ${limit:.2f}")
-            self.daily_spent_label.config(text=f"Spent Today: ${spent:.2f}")
-            self.daily_remaining_label.config(text=f"Remaining Today: ${remaining:.2f}")
-            self.total_balance_label.config(text=f"Balance: ${balance:.2f}")
-
-            # refresh transaction list
-            self.transactions_list.delete(0, tk.END)
-            for idx, t in enumerate(self.tracker.get_transactions_for_date(date_str)):
-                sign = "-" if t["type"] == "expense" else "+"
-                desc = f": {t['description']}" if t.get("description") else ""
-                self.transactions_list.insert(idx, f"{sign}${t['amount']:.2f} ({t['type']}){desc}")
-            if self.transactions_list.size() == 0:
-                self.transactions_list.insert(0, "No transactions for this date.")
+        win = tk.Toplevel(self.root)
+        win.title("Balance Forecast")
+        p = result["percentiles"]
+        text = tk.Text(win, width=70, height=16, font="TkFixedFont")
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text.insert(tk.END, "Month end   " + "".join(f"{f'P{q}':>11}" for q in p) + "\n")
+        for i, date_str in enumerate(result["dates"]):
+            last_of_month = i + 1 == len(result["dates"]) or result["dates"][i + 1][:7] != date_str[:7]
+            if last_of_month:
+                text.insert(tk.END, f"{date_str}  " + "".join(f"{v:>11.2f}" for v in result["balance"][:, i]) + "\n")
+        text.config(state=tk.DISABLED)
+
+    def export_data(self, kind):
+        from tkinter import filedialog
+        import export
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            defaultextension=".csv",
+            initialfile=f"{kind}.csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Columnar", "*.col")]
+        )
+        if not path:
+            return
+        try:
+            rows = export.export(self.tracker, path, kind)
+            messagebox.showinfo("Export", f"Exported {rows} rows to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export: {e}")
 
     def on_closing(self):
         """Handle window closing event."""
@@ -380,8 +698,34 @@ class FinancialTrackerApp:
             messagebox.showwarning("Save Error", f"Could not save data: {e}")
         self.root.destroy()
 
+def startup_probe(root, app, path=None):
+    """
+    Report the time from start to the first paint and to a fully built
+    window, then quit (see bench.py).  The windowed build has no stdout,
+    so the result is written to `path` when one is given.
+    """
+    root.wait_visibility()
+    while not app._settings_built:  # first paint, then the deferred panels
+        root.update()
+    root.update()
+    ready = time.perf_counter()
+    result = (f"first_paint_ms={(app.first_paint_at - _STARTED) * 1000:.1f} "
+              f"ready_ms={(ready - _STARTED) * 1000:.1f}")
+    if path:
+        with open(path, "w") as f:
+            f.write(result + "\n")
+    elif sys.stdout:
+        print(result, flush=True)
+    root.destroy()
+
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = FinancialTrackerApp(root)
-    root.mainloop()
+    if "--startup-probe" in sys.argv:
+        # --startup-probe [PATH]
+        i = sys.argv.index("--startup-probe")
+        startup_probe(root, app, sys.argv[i + 1] if i + 1 < len(sys.argv) else None)
+    else:
+        root.mainloop()
 
@@ -0,0 +1,107 @@
+import datetime
+from calendar import monthrange
+
+from categories import DEFAULT_CATEGORY
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def _parse(date_str):
+    return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def _add_months(date, months, anchor_day):
+    """Same day `months` later, clamped to the month end like _get_days_in_period"""
+    month_index = date.month - 1 + months
+    year = date.year + month_index // 12
+    month = month_index % 12 + 1
+    return datetime.date(year, month, min(anchor_day, monthrange(year, month)[1]))
+
+
+def make_rule(rule_id, start_date_str, amount, transaction_type="expense", frequency="monthly",
+              description="", category=DEFAULT_CATEGORY, interval=1, end_date_str=None):
+    """Build the compact dict stored in data["recurring"]"""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {frequency}")
+    if int(interval) < 1:
+        raise ValueError("Interval must be at least 1")
+    _parse(start_date_str)
+    if end_date_str is not None and end_date_str < start_date_str:
+        raise ValueError("End date is before start date")
+    return {
+        "id": rule_id,
+        "type": transaction_type,
+        "amount": abs(float(amount)),
+        "description": description,
+        "category": category.strip() or DEFAULT_CATEGORY,
+        "frequency": frequency,
+        "interval": int(interval),
+        "start": start_date_str,
+        "end": end_date_str,
+    }
+
+
+def occurrences(rule, start_date_str, end_date_str):
+    """
+    Yield the "YYYY-MM-DD" dates of a rule within start..end (inclusive).
+    Jumps straight to the first occurrence in the window, so the cost only
+    depends on the window size, not on how old the rule is.
+    """
+    first = _parse(rule["start"])
+    lo = max(first, _parse(start_date_str))
+    hi = _parse(end_date_str)
+    if rule.get("end"):
+        hi = min(hi, _parse(rule["end"]))
+    if hi < lo:
+        return
+
+    interval = rule.get("interval", 1)
+    if rule["frequency"] in ("daily", "weekly"):
+        step = interval * (7 if rule["frequency"] == "weekly" else 1)
+        n = -(-(lo - first).days // step)  # ceil
+        current = first + datetime.timedelta(days=n * step)
+        delta = datetime.timedelta(days=step)
+        while current <= hi:
+            yield current.strftime("%Y-%m-%d")
+            current += delta
+    else:
+        months = (lo.year - first.year) * 12 + lo.month - first.month
+        n = max(0, months // interval)
+        while True:
+            current = _add_months(first, n * interval, first.day)
+            if current > hi:
+                return
+            if current >= lo:
+                yield current.strftime("%Y-%m-%d")
+            n += 1
+
+
+def around(rule, date_str):
+    """(last occurrence on or before date_str, first one after it), None where there is none"""
+    step = rule.get("interval", 1) * {"daily": 1, "weekly": 7, "monthly": 31}[rule["frequency"]]
+    date = _parse(date_str)
+    before = list(occurrences(rule, (date - datetime.timedelta(days=step)).strftime("%Y-%m-%d"), date_str))
+    after = occurrences(rule, (date + datetime.timedelta(days=1)).strftime("%Y-%m-%d"),
+                        (date + datetime.timedelta(days=step)).strftime("%Y-%m-%d"))
+    return (before[-1] if before else None), next(after, None)
+
+
+def occurrence(rule, date_str):
+    """The virtual transaction a rule generates on one of its dates"""
+    return {
+        "type": rule["type"],
+        "amount": rule["amount"],
+        "description": rule.get("description", ""),
+        "category": rule.get("category") or DEFAULT_CATEGORY,
+        "timestamp": date_str,
+        "recurring_id": rule["id"],
+    }
+
+
+def materialize(rules, start_date_str, end_date_str):
+    """Occurrences of all rules in a window as {date: [transactions]}"""
+    generated = {}
+    for rule in rules:
+        for date_str in occurrences(rule, start_date_str, end_date_str):
+            generated.setdefault(date_str, []).append(occurrence(rule, date_str))
+    return generated
@@ -0,0 +1,230 @@
+import copy
+from types import MappingProxyType
+
+import categories
+
+# Dated sections of a snapshot; "generated" holds the materialized recurring
+# occurrences and "category_days" the per-day expense totals of the category
+# index, neither of which is saved
+DATED_SECTIONS = ("transactions", "generated", "daily_limits", "surplus_adjustments", "category_days")
+SAVED_SECTIONS = ("daily_limits", "surplus_adjustments", "transactions")
+_EMPTY = MappingProxyType({})
+
+
+def _frozen(section, value):
+    """Transaction lists and category totals are mutable in the tracker, so they are copied"""
+    if section == "category_days":
+        return MappingProxyType(dict(value))
+    return tuple(value) if section in ("transactions", "generated") else value
+
+
+def _split_months(section, source):
+    months = {}
+    for date_str, value in source.items():
+        months.setdefault(date_str[:7], {})[date_str] = _frozen(section, value)
+    return {m: MappingProxyType(bucket) for m, bucket in months.items()}
+
+
+class Snapshot:
+    """
+    Immutable, versioned view of the tracker's data.
+
+    Dated sections are kept as read-only month buckets.  The next version
+    copies only the buckets of the months a change touched and shares all
+    others with this one, so taking a snapshot is O(1) and publishing one
+    costs O(touched months).  Transaction dicts themselves are shared too:
+    the tracker replaces a transaction instead of editing it in place.
+
+    The category index is published the same way (day totals as a dated
+    section, month totals per month), so breakdowns never walk the raw
+    transactions here either.
+
+    Readers get the same getters as FinancialTracker (enough for export),
+    but never see a half-finished recalculation.  A version lives as long
+    as somebody holds it.
+    """
+
+    __slots__ = ("version", "settings", "recurring", "compacted_through", "compacted_basis", "_sections",
+                 "_category_months", "_recomputed", "__weakref__")
+
+    def __init__(self, version, settings, recurring, compacted_through, compacted_basis, sections,
+                 category_months):
+        self.version = version
+        self.settings = settings
+        self.recurring = recurring
+        self.compacted_through = compacted_through
+        self.compacted_basis = compacted_basis  # shared: compact() replaces it, never edits it
+        self._sections = sections   # section: {"YYYY-MM": read-only {date: value}}
+        self._category_months = category_months  # "YYYY-MM": read-only {category: total}
+        # (limits, adjustments) of compacted days, recomputed from this version on first read
+        self._recomputed = ({}, {})
+
+    @classmethod
+    def build(cls, tracker, version=0):
+        """Full snapshot of a tracker (at load and after bulk changes)"""
+        data = tracker.data
+        sections = {section: _split_months(section, cls._source(tracker, section))
+                    for section in DATED_SECTIONS}
+        category_months = {m: MappingProxyType(dict(totals))
+                           for m, totals in tracker.categories._months.items()}
+        return cls(version, MappingProxyType(copy.deepcopy(data["settings"])), tuple(data["recurring"]),
+                   data.get("compacted_through"), data.get("compacted_basis"), sections, category_months)
+
+    @staticmethod
+    def _source(tracker, section):
+        if section == "generated":
+            return tracker._generated
+        if section == "category_days":
+            return tracker.categories._days
+        return tracker.data[section]
+
+    def evolve(self, tracker, event):
+        """
+        Next version after a ChangeEvent: only the months of the dates it
+        touched are copied (and only those dates re-read from the tracker),
+        every other bucket is shared with this version.  The small sections
+        (recurring rules, compaction watermark) are always re-read.
+        """
+        data = tracker.data
+        touched = {
+            "transactions": event.transactions,
+            "generated": event.transactions,
+            "daily_limits": event.limits,
+            "surplus_adjustments": event.adjustments,
+            "category_days": event.transactions,
+        }
+        sections = {}
+        for section in DATED_SECTIONS:
+            if not touched[section]:
+                sections[section] = self._sections[section]
+                continue
+            by_month = {}
+            for date_str in touched[section]:
+                by_month.setdefault(date_str[:7], []).append(date_str)
+            buckets = dict(self._sections[section])
+            source = self._source(tracker, section)
+            for month, dates in by_month.items():
+                bucket = dict(buckets.get(month, _EMPTY))
+                for date_str in dates:
+                    if date_str in source:
+                        bucket[date_str] = _frozen(section, source[date_str])
+                    else:
+                        bucket.pop(date_str, None)
+                if bucket:
+                    buckets[month] = MappingProxyType(bucket)
+                else:
+                    buckets.pop(month, None)
+            sections[section] = buckets
+        category_months = self._category_months
+        if event.transactions:
+            category_months = dict(category_months)
+            for month in {d[:7] for d in event.transactions}:
+                totals = tracker.categories.month_totals(month)
+                if totals:
+                    category_months[month] = MappingProxyType(totals)
+                else:
+                    category_months.pop(month, None)
+        settings = MappingProxyType(copy.deepcopy(data["settings"])) if event.settings else self.settings
+        return Snapshot(self.version + 1, settings, tuple(data["recurring"]),
+                        data.get("compacted_through"), data.get("compacted_basis"), sections, category_months)
+
+    # --- reads ---
+
+    def _get(self, section, date_str, default=None):
+        return self._sections[section].get(date_str[:7], _EMPTY).get(date_str, default)
+
+    def _compacted(self, date_str):
+        return self.compacted_through is not None and date_str <= self.compacted_through
+
+    def _recompute(self, date_str):
+        """
+        (limit or None, adjustment) of a compacted day, recalculated from
+        this version's own settings, rules and transactions
+        """
+        limits, adjustments = self._recomputed
+        if date_str not in limits:
+            from logic import recompute_period  # logic imports this module
+            transactions = {d: txs for bucket in self._sections["transactions"].values()
+                            for d, txs in bucket.items()}
+            basis = self.compacted_basis or {"settings": dict(self.settings), "recurring": self.recurring}
+            period_limits, period_adjustments = recompute_period(basis["settings"], basis["recurring"],
+                                                                 transactions, date_str)
+            for section, target in ((period_limits, limits), (period_adjustments, adjustments)):
+                target.update((k, v) for k, v in section.items() if k <= self.compacted_through)
+            limits.setdefault(date_str, None)
+        return limits[date_str], adjustments.get(date_str, 0)
+
+    def get_transactions_for_date(self, date_str):
+        return self._get("transactions", date_str, ())
+
+    def get_recurring_for_date(self, date_str):
+        return self._get("generated", date_str, ())
+
+    def _all_transactions_for_date(self, date_str):
+        return self.get_transactions_for_date(date_str) + self.get_recurring_for_date(date_str)
+
+    def get_daily_expenses(self, date_str):
+        return sum(t["amount"] for t in self._all_transactions_for_date(date_str) if t["type"] == "expense")
+
+    def get_counted_expenses(self, date_str):
+        """Same rule as FinancialTracker.get_counted_expenses"""
+        budgets = self.settings.get("category_budgets", {})
+        if not budgets:
+            return self.get_daily_expenses(date_str)
+        return sum(max(0, spent - budgets[c]) if c in budgets else spent
+                   for c, spent in self._get("category_days", date_str, _EMPTY).items())
+
+    def get_category_totals(self, start_date_str, end_date_str=None):
+        """Expense totals per category for start..end (inclusive), from the published buckets"""
+        return categories.range_totals(lambda d: self._get("category_days", d, _EMPTY),
+                                       lambda m: self._category_months.get(m, _EMPTY),
+                                       start_date_str, end_date_str or start_date_str)
+
+    def get_daily_limit(self, date_str):
+        """Stored limit of a day (compacted days included)"""
+        limit = self._get("daily_limits", date_str)
+        if limit is None and self._compacted(date_str):
+            return self._recompute(date_str)[0] or 0
+        return limit or 0
+
+    def has_daily_limit(self, date_str):
+        if self._get("daily_limits", date_str) is not None:
+            return True
+        return self._compacted(date_str) and self._recompute(date_str)[0] is not None
+
+    def get_surplus_adjustment(self, date_str):
+        value = self._get("surplus_adjustments", date_str)
+        if value is None and self._compacted(date_str) and self._get("daily_limits", date_str) is None:
+            return self._recompute(date_str)[1]
+        return value or 0
+
+    def date_range(self, sections=("transactions", "daily_limits")):
+        """First and last date stored in the given sections, or (None, None)"""
+        first = last = None
+        for section in sections:
+            months = self._sections[section]
+            if not months:
+                continue
+            lo, hi = min(months), max(months)
+            lo, hi = min(months[lo]), max(months[hi])
+            first = lo if first is None else min(first, lo)
+            last = hi if last is None else max(last, hi)
+        return first, last
+
+    def to_dict(self):
+        """
+        Plain data in the file layout: small sections first, dated sections
+        newest date first (see FinancialTracker._load_data).
+        """
+        data = {
+            "settings": copy.deepcopy(dict(self.settings)),
+            "recurring": list(self.recurring),
+            "compacted_through": self.compacted_through,
+            "compacted_basis": copy.deepcopy(self.compacted_basis),
+        }
+        for section in SAVED_SECTIONS:
+            months = self._sections[section]
+            data[section] = {d: list(v) if isinstance(v, tuple) else v
+                             for m in sorted(months, reverse=True)
+                             for d, v in sorted(months[m].items(), reverse=True)}
+        return data
@@ -0,0 +1,108 @@
+import unittest
+import os
+import csv
+import json
+import export
+from logic import FinancialTracker
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.test_data_file = "test_data.json"
+        if os.path.exists(self.test_data_file):
+            os.remove(self.test_data_file)
+        self.tracker = FinancialTracker(data_file=self.test_data_file)
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        self.tracker.add_transaction("2025-05-11", 12.5, "expense", "Lunch, with team", "food")
+        self.tracker.add_transaction("2025-06-02", 40, "expense", "Bus pass", "transport")
+        self.out_files = []
+
+    def tearDown(self):
+        for path in self.out_files + [self.test_data_file]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _out(self, name):
+        self.out_files.append(name)
+        return name
+
+    def test_csv_transactions(self):
+        """Test CSV export of transactions in date order"""
+        path = self._out("test_export.csv")
+        self.assertEqual(export.export(self.tracker, path), 3)
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["date"] for r in rows], ["2025-05-10", "2025-05-11", "2025-06-02"])
+        self.assertEqual(rows[1]["description"], "Lunch, with team")
+        self.assertEqual(rows[1]["category"], "food")
+
+    def test_jsonl_range(self):
+        """Test JSON Lines export honours the date range"""
+        path = self._out("test_export.jsonl")
+        count = export.export(self.tracker, path, "transactions",
+                              start_date_str="2025-05-11", end_date_str="2025-05-31")
+        self.assertEqual(count, 1)
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows[0]["amount"], 12.5)
+
+    def test_columnar_roundtrip(self):
+        """Test the columnar format reads back what was written, across batches"""
+        path = self._out("test_export.col")
+        rows = list(export.iter_daily_limits(self.tracker, "2025-05-01", "2025-06-30"))
+        with open(path, "wb") as f:
+            export.write_columnar(iter(rows), f, export.COLUMNS["daily_limits"], batch_size=7)
+        with open(path, "rb") as f:
+            read_back = list(export.read_columnar(f))
+        self.assertEqual(len(read_back), len(rows))
+        self.assertEqual(read_back, rows)
+
+    def test_rollups(self):
+        """Test monthly category rollups"""
+        rows = list(export.iter_rollups(self.tracker, "2025-05-01", "2025-06-30"))
+        self.assertEqual(rows, [
+            {"month": "2025-05", "category": "food", "spent": 12.5},
+            {"month": "2025-06", "category": "transport", "spent": 40},
+        ])
+
+    def test_generators_are_lazy(self):
+        """Test row sources are generators, not materialized lists"""
+        rows = export.iter_transactions(self.tracker, "2000-01-01", "2099-12-31")
+        self.assertIs(iter(rows), rows)
+        self.assertEqual(next(rows)["type"], "income")
+
+    def test_recurring_occurrences(self):
+        """Test recurring occurrences are exported without the range being viewed first"""
+        tracker = FinancialTracker(data_file=self.test_data_file)
+        tracker.add_recurring_rule("2025-01-06", 50, "expense", "weekly", "Gym", "health")
+        rows = [r for r in export.iter_rollups(tracker, "2025-01-01", "2025-06-30") if r["category"] == "health"]
+        self.assertEqual(rows[0], {"month": "2025-01", "category": "health", "spent": 200})
+        self.assertEqual(len(rows), 6)
+        path = self._out("test_export_recurring.csv")
+        count = export.export(tracker, path, "transactions",
+                              start_date_str="2025-03-01", end_date_str="2025-03-31")
+        self.assertEqual(count, 5)
+
+    def test_export_leaves_tracker_alone(self):
+        """Test exporting generates occurrences on a copy, not in the live tracker"""
+        self.tracker.add_recurring_rule("2016-01-01", 3000, "income", "monthly", "Salary")
+        limits = dict(self.tracker.data["daily_limits"])
+        window = self.tracker._recurring_window
+        path = self._out("test_export_limits.csv")
+        count = export.export(self.tracker, path, "daily_limits")
+        self.assertGreater(count, 3000)
+        self.assertEqual(self.tracker.data["daily_limits"], limits)
+        self.assertEqual(self.tracker._recurring_window, window)
+        with open(self.test_data_file) as f:
+            self.assertEqual(json.load(f)["daily_limits"], limits)
+
+    def test_start_only_on_empty_tracker(self):
+        """Test a range with only a start date works without any data"""
+        tracker = FinancialTracker(data_file=self._out("test_export_empty.json"))
+        tracker.add_recurring_rule("2025-01-06", 50, "expense", "weekly", "Gym")
+        path = self._out("test_export_start.csv")
+        self.assertGreater(export.export(tracker, path, start_date_str="2025-01-01"), 0)
+        self.assertIsNone(tracker._recurring_window)
+        tracker.ensure_recurring_window("2025-01-01", "2025-01-31")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import datetime
+from logic import FinancialTracker
+import forecast
+
+@unittest.skipIf(forecast.np is None, "NumPy not installed")
+class TestForecast(unittest.TestCase):
+    def setUp(self):
+        self.files = ["test_data.json", "test_expected.json"]
+        for f in self.files:
+            if os.path.exists(f):
+                os.remove(f)
+
+    def tearDown(self):
+        for f in self.files:
+            if os.path.exists(f):
+                os.remove(f)
+
+    def _history(self, data_file, surplus):
+        tracker = FinancialTracker(data_file=data_file)
+        tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        tracker.set_savings_percentage(50)
+        tracker.set_surplus_settings(surplus, 3)
+        for i in range(11):
+            day = datetime.date(2025, 5, 10) + datetime.timedelta(days=i)
+            tracker.add_transaction(day.strftime("%Y-%m-%d"), 20, "expense")
+        return tracker
+
+    def _assert_matches_tracker(self, surplus):
+        """With constant spending every path must equal the tracker's own recalculation"""
+        tracker = self._history(self.files[0], surplus)
+        result = forecast.forecast(tracker, months=1, paths=50,
+                                   start_date=datetime.date(2025, 5, 20), seed=3)
+
+        expected = self._history(self.files[1], surplus)
+        for date_str in result["dates"]:
+            expected.add_transaction(date_str, 20, "expense")
+        expected.add_transaction("2025-06-10", 1000, "income", "Salary")
+        expected.data["surplus_adjustments"].clear()  # drop the top-up chunks
+        expected._recalculate_daily_limits("2025-05-10")
+        expected._recalculate_daily_limits("2025-06-10")
+
+        for i, date_str in enumerate(result["dates"]):
+            for band in result["daily_limit"]:
+                self.assertAlmostEqual(band[i], expected.get_daily_limit(date_str), places=6, msg=date_str)
+        final = expected.get_balance_summary()["remaining_balance"]
+        self.assertAlmostEqual(result["balance"][2][-1], final, places=6)
+
+    def test_matches_tracker_rules(self):
+        self._assert_matches_tracker(surplus=False)
+
+    def test_matches_tracker_rules_with_surplus(self):
+        self._assert_matches_tracker(surplus=True)
+
+    def test_history_includes_recurring(self):
+        """Test occurrences in the history window are generated for the history"""
+        tracker = FinancialTracker(data_file=self.files[0])
+        tracker.add_recurring_rule("2025-01-06", 50, "expense", "weekly", "Gym")
+        raw, counted = forecast.spending_history(tracker, datetime.date(2025, 3, 31), days=28)
+        self.assertEqual(raw.sum(), 200)
+        self.assertEqual(counted.sum(), 200)
+
+    def test_bands_are_ordered(self):
+        """Test percentile bands over a year of random spending"""
+        tracker = FinancialTracker(data_file=self.files[0])
+        tracker.add_recurring_rule("2025-01-01", 3000, "income", "monthly", "Salary")
+        for i in range(60):
+            day = datetime.date(2025, 3, 1) + datetime.timedelta(days=i)
+            tracker.add_transaction(day.strftime("%Y-%m-%d"), (i * 37) % 90, "expense")
+        result = forecast.forecast(tracker, months=12, paths=2000,
+                                   start_date=datetime.date(2025, 5, 1), seed=1)
+        self.assertEqual(result["balance"].shape, (5, 365))
+        for series in (result["balance"], result["daily_limit"]):
+            self.assertTrue((series[:-1] <= series[1:] + 1e-9).all())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+import datetime
+import heatmap
+
+class TestHeatmapLayout(unittest.TestCase):
+    def test_cell_position(self):
+        """Test weeks run left to right with Monday on top"""
+        first = datetime.date(2025, 1, 1)  # a Wednesday
+        self.assertEqual(heatmap.cell_position(first, first), (0, 2))
+        self.assertEqual(heatmap.cell_position(datetime.date(2025, 1, 6), first), (1, 0))
+        self.assertEqual(heatmap.cell_position(datetime.date(2025, 12, 31), first), (52, 2))
+
+    def test_cell_color(self):
+        """Test colors follow spent vs limit"""
+        self.assertEqual(heatmap.cell_color(0, 0), heatmap.NO_LIMIT_COLOR)
+        self.assertEqual(heatmap.cell_color(0, 50), heatmap.NO_LIMIT_COLOR)
+        self.assertEqual(heatmap.cell_color(20, 0), heatmap.SCALE[0][1])
+        self.assertEqual(heatmap.cell_color(20, 20), heatmap.SCALE[-1][1])
+        self.assertEqual(heatmap.cell_color(20, 21), heatmap.EXCEEDED_COLOR)
+
+if __name__ == "__main__":
+    unittest.main()
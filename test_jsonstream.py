@@ -0,0 +1,59 @@
+import io
+import json
+import unittest
+
+import jsonstream
+
+
+class TestJsonStream(unittest.TestCase):
+    def _rebuild(self, text, chunk_size):
+        data = {}
+        for section, key, value in jsonstream.iter_entries(io.StringIO(text), chunk_size):
+            if key is None:
+                data[section] = value
+            else:
+                data[section][key] = value
+        return data
+
+    def test_matches_json_load(self):
+        """Test the stream rebuilds the same tree at any chunk size, numbers cut at a boundary included"""
+        data = {
+            "settings": {"savings_percentage": 12.5, "fixed_daily_limit": None, "category_budgets": {}},
+            "recurring": [{"id": 1, "amount": 1234567.891}],
+            "compacted_through": None,
+            "daily_limits": {},
+            "transactions": {f"2025-05-{d:02d}": [{"type": "expense", "amount": d * 111.11,
+                                                   "description": "café \"quoted\""}]
+                             for d in range(28, 0, -1)},
+        }
+        for text in (json.dumps(data), json.dumps(data, indent=2)):
+            for chunk_size in (1, 3, 7, 64, 1 << 16):
+                self.assertEqual(self._rebuild(text, chunk_size), data)
+        self.assertEqual(self._rebuild("{}", 1), {})
+
+    def test_entry_order(self):
+        """Test object sections are announced before their entries"""
+        text = json.dumps({"a": {"x": 1, "y": [2]}, "b": 3})
+        self.assertEqual(list(jsonstream.iter_entries(io.StringIO(text), 2)),
+                         [("a", None, {}), ("a", "x", 1), ("a", "y", [2]), ("b", None, 3)])
+
+    def test_corrupted(self):
+        """Test a truncated file raises JSONDecodeError"""
+        with self.assertRaises(json.JSONDecodeError):
+            list(jsonstream.iter_entries(io.StringIO('{"a": {"x": 1, "y": '), 4))
+
+    def test_background_loader(self):
+        """Test the loader hands over every remaining entry, then None"""
+        entries = iter([("t", str(i), i) for i in range(2500)])
+        loader = jsonstream.BackgroundLoader(entries, batch_size=1000, max_batches=1)
+        received = []
+        while True:
+            batch = loader.next_batch()
+            if batch is None:
+                break
+            received.extend(batch)
+        self.assertEqual([value for _, _, value in received], list(range(2500)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 import os
 import json
+import threading
 import datetime
 from logic import FinancialTracker
+from history import CommandHistory
 
 class TestFinancialTracker(unittest.TestCase):
     def setUp(self):
@@ -171,5 +173,385 @@ class TestFinancialTracker(unittest.TestCase):
         self.assertNotIn(day6, self.tracker.data["surplus_adjustments"])
         # Limit calculation depends on previous days, so just check adjustment is gone
 
+    def test_category_totals(self):
+        """Test per-category totals are kept in sync with add/edit/remove"""
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        self.tracker.add_transaction("2025-05-11", 12, "expense", "Lunch", "food")
+        self.tracker.add_transaction("2025-05-31", 8, "expense", "Dinner", "food")
+        self.tracker.add_transaction("2025-06-01", 40, "expense", "Bus pass", "transport")
+        self.tracker.add_transaction("2025-06-02", 5, "expense", "Snack")
+
+        totals = self.tracker.get_category_totals("2025-05-01", "2025-06-30")
+        self.assertAlmostEqual(totals["food"], 20)
+        self.assertAlmostEqual(totals["transport"], 40)
+        self.assertAlmostEqual(totals["uncategorized"], 5)
+        self.assertNotIn("Salary", totals)
+
+        # Partial month at either edge
+        self.assertEqual(self.tracker.get_category_totals("2025-05-31", "2025-06-01"),
+                         {"food": 8, "transport": 40})
+
+        # Moving an expense to another category moves its total
+        self.tracker.edit_transaction("2025-05-31", 0, category="transport", amount=10)
+        totals = self.tracker.get_category_totals("2025-05-01", "2025-06-30")
+        self.assertAlmostEqual(totals["food"], 12)
+        self.assertAlmostEqual(totals["transport"], 50)
+
+        self.tracker.remove_transaction("2025-06-01", 0)
+        self.assertEqual(self.tracker.get_category_totals("2025-06-01"), {})
+
+        # The index rebuilt at load matches the incrementally maintained one
+        new_tracker = FinancialTracker(data_file=self.test_data_file)
+        self.assertEqual(new_tracker.get_category_totals("2025-05-01", "2025-06-30"),
+                         self.tracker.get_category_totals("2025-05-01", "2025-06-30"))
+
+    def test_category_budget(self):
+        """Test category budgets are reserved from the limit and only overruns roll over"""
+        payday = "2025-05-10"
+        self.tracker.add_transaction(payday, 1000, "income", "Salary")
+        base_limit = self.tracker.get_daily_limit("2025-05-11")
+
+        self.tracker.set_category_budget("food", 10)
+        self.assertAlmostEqual(self.tracker.get_daily_limit("2025-05-11"), base_limit - 10)
+
+        # Spending within the food budget doesn't touch the daily limit
+        self.tracker.add_transaction("2025-05-11", 8, "expense", "Lunch", "food")
+        self.assertEqual(self.tracker.get_counted_expenses("2025-05-11"), 0)
+        self.assertAlmostEqual(self.tracker.get_daily_limit("2025-05-12"), 2 * (base_limit - 10))
+
+        # Only the overrun counts
+        self.tracker.add_transaction("2025-05-11", 7, "expense", "Groceries", "food")
+        self.assertAlmostEqual(self.tracker.get_counted_expenses("2025-05-11"), 5)
+
+        self.tracker.set_category_budget("food", None)
+        self.assertEqual(self.tracker.get_category_budgets(), {})
+        self.assertAlmostEqual(self.tracker.get_daily_limit("2025-05-11"), base_limit)
+
+    def test_undo_redo_transactions(self):
+        """Test undo/redo of add, edit and remove restores limits and totals"""
+        payday = "2025-05-10"
+        self.tracker.add_transaction(payday, 1000, "income", "Salary")
+        limits_before = dict(self.tracker.data["daily_limits"])
+
+        self.tracker.add_transaction("2025-05-11", 30, "expense", "Overspent", "food")
+        limits_after_add = dict(self.tracker.data["daily_limits"])
+        self.assertNotEqual(limits_before, limits_after_add)
+
+        self.assertTrue(self.tracker.undo())
+        self.assertEqual(self.tracker.get_transactions_for_date("2025-05-11"), [])
+        self.assertEqual(self.tracker.data["daily_limits"], limits_before)
+        self.assertEqual(self.tracker.get_category_totals("2025-05-11"), {})
+
+        self.assertTrue(self.tracker.redo())
+        self.assertEqual(self.tracker.data["daily_limits"], limits_after_add)
+        self.assertEqual(self.tracker.get_category_totals("2025-05-11"), {"food": 30})
+
+        self.tracker.edit_transaction("2025-05-11", 0, amount=5, category="fun")
+        self.tracker.remove_transaction("2025-05-11", 0)
+        self.assertTrue(self.tracker.undo())  # remove
+        self.assertEqual(self.tracker.get_transactions_for_date("2025-05-11")[0]["amount"], 5)
+        self.assertTrue(self.tracker.undo())  # edit
+        tx = self.tracker.get_transactions_for_date("2025-05-11")[0]
+        self.assertEqual((tx["amount"], tx["category"]), (30, "food"))
+        self.assertEqual(self.tracker.data["daily_limits"], limits_after_add)
+
+        # A new mutation drops the redo stack
+        self.tracker.add_transaction("2025-05-12", 1, "expense")
+        self.assertFalse(self.tracker.redo())
+
+    def test_undo_mid_period_income(self):
+        """Test undoing an income that started a new period restores the old limits exactly"""
+        self.tracker.set_surplus_settings(True, 3)
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        self.tracker.add_transaction("2025-05-12", 80, "expense", "Shoes")
+        limits = dict(self.tracker.data["daily_limits"])
+        adjustments = dict(self.tracker.data["surplus_adjustments"])
+
+        self.tracker.add_transaction("2025-05-20", 500, "income", "Bonus")
+        after = (dict(self.tracker.data["daily_limits"]), dict(self.tracker.data["surplus_adjustments"]))
+        self.assertIn("2025-06-15", after[0])
+        self.assertTrue(self.tracker.undo())
+        self.assertEqual(self.tracker.data["daily_limits"], limits)
+        self.assertEqual(self.tracker.data["surplus_adjustments"], adjustments)
+        self.assertTrue(self.tracker.redo())
+        self.assertEqual((self.tracker.data["daily_limits"], self.tracker.data["surplus_adjustments"]), after)
+
+    def test_undo_settings(self):
+        """Test undo of settings changes"""
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        self.tracker.set_savings_percentage(20)
+        self.tracker.set_fixed_daily_limit(25)
+        self.tracker.undo()
+        self.assertEqual(self.tracker.data["settings"]["savings_percentage"], 20)
+        self.assertIsNone(self.tracker.data["settings"]["fixed_daily_limit"])
+        self.assertAlmostEqual(self.tracker.get_daily_limit("2025-05-11"), 25.81, delta=0.1)
+        self.tracker.undo()
+        self.tracker.undo()
+        self.assertEqual(self.tracker.get_transactions_for_date("2025-05-10"), [])
+        self.assertFalse(self.tracker.undo())
+
+    def test_history_is_bounded(self):
+        """Test the undo history keeps only the most recent commands"""
+        self.tracker.history = CommandHistory(max_size=3)
+        for i in range(5):
+            self.tracker.add_transaction("2025-05-11", i + 1, "expense")
+        undone = 0
+        while self.tracker.undo():
+            undone += 1
+        self.assertEqual(undone, 3)
+        self.assertEqual([t["amount"] for t in self.tracker.get_transactions_for_date("2025-05-11")], [1, 2])
+
+    def test_recurring_paydays_and_expenses(self):
+        """Test generated occurrences drive the recalculation like real transactions"""
+        salary = self.tracker.add_recurring_rule("2025-05-10", 1000, "income", "monthly", "Salary")
+        self.tracker.add_recurring_rule("2025-05-12", 20, "expense", "weekly", "Gym", "fun")
+        # Nothing is generated until a window is requested
+        self.assertEqual(self.tracker.data["daily_limits"], {})
+        self.assertEqual(self.tracker.data["transactions"], {})
+
+        self.tracker.ensure_recurring_window("2025-05-01", "2025-06-30")
+        self.assertEqual(len(self.tracker.get_recurring_for_date("2025-06-10")), 1)
+
+        # Same result as entering the occurrences by hand
+        manual = FinancialTracker(data_file="test_manual.json")
+        self.addCleanup(lambda: os.path.exists("test_manual.json") and os.remove("test_manual.json"))
+        manual.add_transaction("2025-05-10", 1000, "income", "Salary")
+        manual.add_transaction("2025-06-10", 1000, "income", "Salary")
+        for day in ("2025-05-12", "2025-05-19", "2025-05-26", "2025-06-02", "2025-06-09",
+                    "2025-06-16", "2025-06-23", "2025-06-30"):
+            manual.add_transaction(day, 20, "expense", "Gym", "fun")
+        manual._recalculate_daily_limits("2025-05-10")
+        manual._recalculate_daily_limits("2025-06-10")
+        self.assertEqual(self.tracker.data["daily_limits"].keys(), manual.data["daily_limits"].keys())
+        for day, limit in manual.data["daily_limits"].items():
+            self.assertAlmostEqual(self.tracker.get_daily_limit(day), limit, places=6)
+        self.assertAlmostEqual(self.tracker.get_category_totals("2025-05-01", "2025-05-31")["fun"], 60)
+
+        # Removing the salary rule drops the generated paydays and their limits
+        self.tracker.remove_recurring_rule(salary)
+        self.assertEqual(self.tracker.get_payday_income("2025-06-10"), 0)
+        self.assertTrue(self.tracker.undo())
+        self.assertEqual(self.tracker.get_payday_income("2025-06-10"), 1000)
+
+    def test_recurring_rules_persist(self):
+        """Test rule changes are saved even without occurrences in the materialized window"""
+        rule_id = self.tracker.add_recurring_rule("2025-05-10", 1000, "income", "monthly")
+        self.tracker.add_recurring_rule("2025-05-01", 20, "expense", "weekly", "Gym")
+        reloaded = FinancialTracker(data_file=self.test_data_file)
+        self.assertEqual(reloaded.get_recurring_rules(), self.tracker.get_recurring_rules())
+
+        self.tracker.remove_recurring_rule(rule_id)
+        reloaded = FinancialTracker(data_file=self.test_data_file)
+        self.assertEqual([r["description"] for r in reloaded.get_recurring_rules()], ["Gym"])
+
+        self.tracker.undo()
+        reloaded = FinancialTracker(data_file=self.test_data_file)
+        self.assertEqual(len(reloaded.get_recurring_rules()), 2)
+
+    def test_recurring_window_extends_lazily(self):
+        """Test only the new part of a window is generated"""
+        self.tracker.add_recurring_rule("2025-01-01", 5, "expense", "daily")
+        self.tracker.ensure_recurring_window("2025-05-01", "2025-05-31")
+        self.assertEqual(len(self.tracker._generated), 31)
+        self.tracker.ensure_recurring_window("2025-05-15", "2025-06-10")
+        self.assertEqual(len(self.tracker._generated), 41)
+        self.assertEqual(len(self.tracker.get_recurring_for_date("2025-05-20")), 1)
+        self.assertNotIn("recurring_id", json.dumps(self.tracker.data["transactions"]))
+
+    def test_change_events(self):
+        """Test change events list exactly the dates a mutation affected"""
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        events = []
+        self.tracker.subscribe(events.append)
+
+        self.tracker.add_transaction("2025-05-20", 10, "expense", "Lunch")
+        event = events[-1]
+        self.assertEqual(event.transactions, {"2025-05-20"})
+        # Only days after the expense get a different limit
+        self.assertEqual(min(event.limits), "2025-05-21")
+        self.assertFalse(event.settings)
+        self.assertTrue(event.balance_changed)
+
+        # An edit that changes nothing numerically touches only its own date
+        self.tracker.edit_transaction("2025-05-20", 0, description="Dinner")
+        self.assertEqual(events[-1].dates, {"2025-05-20"})
+
+        self.tracker.set_surplus_settings(False, 3)
+        self.assertTrue(events[-1].settings)
+        self.assertEqual(events[-1].dates, set())
+
+        self.tracker.undo()
+        self.assertTrue(events[-1].settings)
+
+        self.tracker.unsubscribe(events.append)
+        count = len(events)
+        self.tracker.add_transaction("2025-05-21", 10, "expense")
+        self.assertEqual(len(events), count)
+
+    def test_range_summary(self):
+        """Test the bulk range query agrees with the per-day getters"""
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        self.tracker.add_transaction("2025-05-12", 30, "expense", "Lunch", "food")
+        self.tracker.set_category_budget("food", 10)
+        summary = self.tracker.get_range_summary("2025-05-09", "2025-05-13")
+        self.assertEqual([row[0] for row in summary],
+                         ["2025-05-09", "2025-05-10", "2025-05-11", "2025-05-12", "2025-05-13"])
+        for date_str, limit, spent, counted in summary:
+            self.assertEqual(limit, self.tracker.get_daily_limit(date_str))
+            self.assertEqual(spent, self.tracker.get_daily_expenses(date_str))
+            self.assertEqual(counted, self.tracker.get_counted_expenses(date_str))
+        self.assertEqual(summary[3][2:], (30, 20))
+
+    def test_compaction(self):
+        """Test compaction drops stale entries and old limits are recomputed on read"""
+        self.tracker.add_transaction("2023-01-10", 3000, "income", "Salary")
+        self.tracker.add_transaction("2023-01-15", 200, "expense", "Shoes")
+        self.tracker.add_transaction("2023-02-10", 3000, "income", "Salary")
+        recent = (datetime.date.today() - datetime.timedelta(days=5)).strftime("%Y-%m-%d")
+        self.tracker.add_transaction(recent, 1000, "income", "Salary")
+        old_days = ["2023-01-11", "2023-01-20", "2023-02-15"]
+        expected = {d: self.tracker.get_daily_limit(d) for d in old_days}
+        recent_limit = self.tracker.get_daily_limit(self.tracker._shift_date(recent, 1))
+        # An orphan limit and a zero adjustment
+        self.tracker.data["daily_limits"]["2022-06-01"] = 50
+        self.tracker.data["surplus_adjustments"]["2023-01-12"] = 0
+
+        report = self.tracker.compact(retention_days=365)
+        self.assertGreaterEqual(report["limits_removed"], 30)
+        self.assertGreater(report["bytes_reclaimed"], 0)
+        self.assertNotIn("2022-06-01", self.tracker.data["daily_limits"])
+        self.assertNotIn("2023-01-20", self.tracker.data["daily_limits"])
+        self.assertNotIn("2023-01-12", self.tracker.data["surplus_adjustments"])
+        self.assertEqual(self.tracker.get_daily_limit(self.tracker._shift_date(recent, 1)), recent_limit)
+
+        # Old periods are recomputed on demand, also after a reload
+        for tracker in (self.tracker, FinancialTracker(data_file=self.test_data_file)):
+            for d in old_days:
+                self.assertAlmostEqual(tracker.get_daily_limit(d), expected[d])
+                self.assertTrue(tracker.has_daily_limit(d))
+            self.assertFalse(tracker.has_daily_limit("2022-06-01"))
+            self.assertNotIn("2023-01-20", tracker.data["daily_limits"])
+
+    def test_compaction_recurring_income(self):
+        """Test periods started by a recurring payday are recomputed after a reload"""
+        self.tracker.add_recurring_rule("2023-01-10", 3000, "income", "monthly", "Salary")
+        self.tracker.add_transaction("2023-01-15", 200, "expense", "Shoes")
+        self.tracker.ensure_recurring_window("2023-01-01", "2023-03-31")
+        old_days = ["2023-01-11", "2023-01-20", "2023-02-15"]
+        expected = {d: self.tracker.get_daily_limit(d) for d in old_days}
+        self.assertGreater(expected["2023-01-20"], 0)
+
+        self.tracker.compact(retention_days=365)
+        self.assertNotIn("2023-01-20", self.tracker.data["daily_limits"])
+        for tracker in (self.tracker, FinancialTracker(data_file=self.test_data_file)):
+            for d in old_days:
+                self.assertAlmostEqual(tracker.get_daily_limit(d), expected[d])
+                self.assertTrue(tracker.has_daily_limit(d))
+
+    def test_compaction_keeps_history_after_settings_change(self):
+        """Test reopening the file after a settings change doesn't rewrite old periods"""
+        for payday in ("2023-01-10", "2023-02-10", "2023-03-10"):
+            self.tracker.add_transaction(payday, 3000, "income", "Salary")
+        self.tracker.add_transaction("2023-01-15", 200, "expense", "Shoes", "clothes")
+        self.tracker.set_savings_percentage(50)
+        days = ["2023-01-20", "2023-02-15", "2023-03-15"]
+        expected = {d: self.tracker.get_daily_limit(d) for d in days}
+        self.assertAlmostEqual(expected["2023-02-15"], 3000 / 28 * 5)
+
+        tracker = FinancialTracker(data_file=self.test_data_file)
+        self.assertIsNotNone(tracker.data["compacted_through"])
+        self.assertNotIn("2023-01-20", tracker.data["daily_limits"])
+        for d in days:
+            self.assertAlmostEqual(tracker.get_daily_limit(d), expected[d], msg=d)
+        # periods compacted under the old settings are recomputed with those
+        tracker.set_category_budget("clothes", 5)
+        expected = {d: tracker.get_daily_limit(d) for d in days}
+        self.assertAlmostEqual(expected["2023-01-20"], 3000 / 31 * 10 / 2 - 200)
+        reopened = FinancialTracker(data_file=self.test_data_file)
+        for d in days:
+            self.assertAlmostEqual(reopened.get_daily_limit(d), expected[d], msg=d)
+            self.assertAlmostEqual(reopened.snapshot().get_daily_limit(d), expected[d], msg=d)
+
+    def test_compaction_long_period(self):
+        """Test a compacted period reaching far ahead to the next payday is recomputed whole"""
+        self.tracker.add_transaction("2023-06-10", 3000, "income", "Bonus")
+        self.tracker.add_transaction("2021-01-10", 3000, "income", "Bonus")
+        expected = self.tracker.get_daily_limit("2021-02-01")
+        self.assertGreater(expected, 0)
+        self.tracker.compact(retention_days=365)
+        self.assertNotIn("2021-02-01", self.tracker.data["daily_limits"])
+        tracker = FinancialTracker(data_file=self.test_data_file)
+        self.assertAlmostEqual(tracker.get_daily_limit("2021-02-01"), expected)
+
+    def test_background_load(self):
+        """Test a background load answers the current month first and ends up identical"""
+        today = datetime.date.today()
+        for offset in range(0, 400, 3):
+            day = (today - datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+            if offset % 30 == 0:
+                self.tracker.add_transaction(day, 2000, "income", "Salary")
+            self.tracker.add_transaction(day, 5 + offset % 7, "expense", "Lunch", "food")
+        # Dated sections are saved newest first, after the small ones
+        with open(self.test_data_file) as f:
+            saved = json.load(f)
+        self.assertEqual(list(saved)[-1], "transactions")
+        self.assertEqual(list(saved["transactions"]), sorted(saved["transactions"], reverse=True))
+
+        full = FinancialTracker(data_file=self.test_data_file)
+        partial = FinancialTracker(data_file=self.test_data_file, background_load=True)
+        self.assertTrue(partial.is_loading)
+        today_str = today.strftime("%Y-%m-%d")
+        self.assertEqual(partial.get_transactions_for_date(today_str),
+                         full.get_transactions_for_date(today_str))
+        # An old date blocks until its batch is in
+        old = (today - datetime.timedelta(days=399)).strftime("%Y-%m-%d")
+        self.assertEqual(partial.get_daily_expenses(old), full.get_daily_expenses(old))
+        partial.wait_loaded()
+        self.assertFalse(partial.is_loading)
+        self.assertEqual(partial.data, full.data)
+        self.assertEqual(partial.get_category_totals(old, today_str), full.get_category_totals(old, today_str))
+
+    def test_snapshot_from_another_thread_during_load(self):
+        """Test a reader thread waits for the owner to finish a background load"""
+        today = datetime.date.today()
+        for offset in range(0, 400, 3):
+            day = (today - datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+            self.tracker.add_transaction(day, 5, "expense", "Lunch", "food")
+        partial = FinancialTracker(data_file=self.test_data_file, background_load=True)
+        self.assertTrue(partial.is_loading)
+        result = []
+        reader = threading.Thread(target=lambda: result.append(partial.snapshot()))
+        reader.start()
+        reader.join(0.2)
+        self.assertTrue(reader.is_alive())
+        self.assertTrue(partial.is_loading)  # the reader didn't merge anything
+        while partial.load_step():
+            pass
+        reader.join(5)
+        self.assertEqual(result[0].to_dict()["transactions"], self.tracker.snapshot().to_dict()["transactions"])
+
+    def test_recurring_window_during_background_load(self):
+        """Test materializing the shown month doesn't finish the load, and ends up identical"""
+        today = datetime.date.today()
+        for offset in range(0, 400, 3):
+            day = (today - datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+            self.tracker.add_transaction(day, 5 + offset % 7, "expense", "Lunch", "food")
+        self.tracker.add_recurring_rule((today - datetime.timedelta(days=500)).strftime("%Y-%m-%d"),
+                                        2000, "income", "monthly", "Salary")
+        start = (today - datetime.timedelta(days=31)).strftime("%Y-%m-%d")
+        end = (today + datetime.timedelta(days=62)).strftime("%Y-%m-%d")
+
+        full = FinancialTracker(data_file=self.test_data_file)
+        full.ensure_recurring_window(start, end)
+        partial = FinancialTracker(data_file=self.test_data_file, background_load=True)
+        events = []
+        partial.subscribe(events.append)
+        partial.ensure_recurring_window(start, end)
+        self.assertTrue(partial.is_loading)
+        self.assertTrue(partial._generated)
+        partial.wait_loaded()
+        self.assertTrue(events[-1].limits)
+        self.assertEqual(partial.data, full.data)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import recurring
+
+class TestRecurring(unittest.TestCase):
+    def test_monthly_clamps_to_month_end(self):
+        """Test monthly rules keep their day and clamp short months"""
+        rule = recurring.make_rule(1, "2025-01-31", 100, frequency="monthly")
+        dates = list(recurring.occurrences(rule, "2025-01-01", "2025-05-31"))
+        self.assertEqual(dates, ["2025-01-31", "2025-02-28", "2025-03-31", "2025-04-30", "2025-05-31"])
+
+    def test_window_starts_mid_rule(self):
+        """Test occurrences jump straight into a later window"""
+        weekly = recurring.make_rule(1, "2020-01-06", 10, frequency="weekly", interval=2)
+        self.assertEqual(list(recurring.occurrences(weekly, "2025-05-01", "2025-05-31")),
+                         ["2025-05-05", "2025-05-19"])
+        monthly = recurring.make_rule(2, "2020-03-15", 10, frequency="monthly", interval=3)
+        self.assertEqual(list(recurring.occurrences(monthly, "2025-01-01", "2025-12-31")),
+                         ["2025-03-15", "2025-06-15", "2025-09-15", "2025-12-15"])
+
+    def test_end_date(self):
+        """Test rules stop at their end date"""
+        rule = recurring.make_rule(1, "2025-05-01", 5, frequency="daily", end_date_str="2025-05-03")
+        self.assertEqual(list(recurring.occurrences(rule, "2025-04-01", "2025-06-01")),
+                         ["2025-05-01", "2025-05-02", "2025-05-03"])
+
+    def test_invalid_rules(self):
+        """Test bad frequencies and intervals are rejected"""
+        with self.assertRaises(ValueError):
+            recurring.make_rule(1, "2025-05-01", 5, frequency="yearly")
+        with self.assertRaises(ValueError):
+            recurring.make_rule(1, "2025-05-01", 5, interval=0)
+
+if __name__ == "__main__":
+    unittest.main()
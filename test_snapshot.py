@@ -0,0 +1,101 @@
+import gc
+import os
+import unittest
+import weakref
+
+from logic import FinancialTracker
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_data_file = "test_snapshot_data.json"
+        if os.path.exists(self.test_data_file):
+            os.remove(self.test_data_file)
+        self.tracker = FinancialTracker(data_file=self.test_data_file)
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        self.tracker.add_transaction("2025-05-12", 30, "expense", "Lunch", "food")
+        self.tracker.add_transaction("2025-06-10", 1000, "income", "Salary")
+
+    def tearDown(self):
+        if os.path.exists(self.test_data_file):
+            os.remove(self.test_data_file)
+
+    def test_snapshot_is_unaffected_by_later_changes(self):
+        """Test a snapshot keeps its view through adds, edits and removals"""
+        snap = self.tracker.snapshot()
+        limit = snap.get_daily_limit("2025-05-20")
+        self.tracker.add_transaction("2025-05-15", 50, "expense", "Shoes")
+        self.tracker.edit_transaction("2025-05-12", 0, amount=45)
+        self.tracker.remove_transaction("2025-05-10", 0)
+
+        self.assertEqual(len(snap.get_transactions_for_date("2025-05-10")), 1)
+        self.assertEqual(snap.get_transactions_for_date("2025-05-12")[0]["amount"], 30)
+        self.assertEqual(snap.get_transactions_for_date("2025-05-15"), ())
+        self.assertEqual(snap.get_daily_limit("2025-05-20"), limit)
+        self.assertGreater(self.tracker.snapshot().version, snap.version)
+        self.assertEqual(self.tracker.snapshot().get_transactions_for_date("2025-05-12")[0]["amount"], 45)
+
+    def test_compacted_days_use_own_data(self):
+        """Test compacted days are recomputed from the snapshot, not the live tracker"""
+        self.tracker.add_transaction("2023-01-10", 3000, "income", "Salary")
+        self.tracker.add_transaction("2023-01-15", 200, "expense", "Shoes")
+        expected = {d: self.tracker.get_daily_limit(d) for d in ("2023-01-11", "2023-01-20")}
+        self.tracker.compact(retention_days=365)
+        snap = self.tracker.snapshot()
+        self.tracker.set_savings_percentage(50)
+        self.tracker._recompute_compacted = None  # the snapshot must not call back
+        for date_str, limit in expected.items():
+            self.assertNotIn(date_str, snap._sections["daily_limits"].get(date_str[:7], {}))
+            self.assertAlmostEqual(snap.get_daily_limit(date_str), limit)
+            self.assertTrue(snap.has_daily_limit(date_str))
+        self.assertFalse(snap.has_daily_limit("2022-12-01"))
+
+    def test_structural_sharing(self):
+        """Test only the months a change touched are copied"""
+        snap = self.tracker.snapshot()
+        self.assertIs(self.tracker.snapshot(), snap)
+        self.tracker.add_transaction("2025-06-20", 5, "expense", "Coffee")
+        new = self.tracker.snapshot()
+        self.assertIs(new._sections["transactions"]["2025-05"], snap._sections["transactions"]["2025-05"])
+        self.assertIsNot(new._sections["transactions"]["2025-06"], snap._sections["transactions"]["2025-06"])
+        self.assertIs(new._sections["daily_limits"]["2025-05"], snap._sections["daily_limits"]["2025-05"])
+        self.assertIs(new._sections["category_days"]["2025-05"], snap._sections["category_days"]["2025-05"])
+        self.assertIs(new._category_months["2025-05"], snap._category_months["2025-05"])
+        self.assertEqual(new._category_months["2025-06"], {"uncategorized": 5})
+
+    def test_old_versions_are_released(self):
+        """Test a version nobody holds is freed once a newer one is published"""
+        ref = weakref.ref(self.tracker.snapshot())
+        self.tracker.add_transaction("2025-05-20", 5, "expense")
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_getters_match_tracker(self):
+        """Test snapshot reads agree with the tracker's"""
+        self.tracker.set_category_budget("food", 10)
+        self.tracker.add_recurring_rule("2025-05-01", 7, "expense", "weekly", "Gym", "fun")
+        self.tracker.ensure_recurring_window("2025-05-01", "2025-06-30")
+        snap = self.tracker.snapshot()
+        for date_str in ("2025-05-01", "2025-05-10", "2025-05-12", "2025-05-13", "2025-06-11"):
+            self.assertEqual(snap.get_daily_limit(date_str), self.tracker.get_daily_limit(date_str))
+            self.assertEqual(snap.has_daily_limit(date_str), self.tracker.has_daily_limit(date_str))
+            self.assertEqual(snap.get_daily_expenses(date_str), self.tracker.get_daily_expenses(date_str))
+            self.assertEqual(snap.get_counted_expenses(date_str), self.tracker.get_counted_expenses(date_str))
+        self.assertEqual(snap.get_category_totals("2025-05-01", "2025-06-30"),
+                         self.tracker.get_category_totals("2025-05-01", "2025-06-30"))
+        self.assertEqual(snap.date_range(), ("2025-05-10", max(self.tracker.data["daily_limits"])))
+
+    def test_category_totals_use_buckets(self):
+        """Test category breakdowns read the published buckets, not the transactions"""
+        self.tracker.add_transaction("2025-06-03", 12, "expense", "Taxi", "transport")
+        self.tracker.edit_transaction("2025-05-12", 0, category="fun")
+        snap = self.tracker.snapshot()
+        expected = self.tracker.get_category_totals("2025-04-20", "2025-06-30")
+        self.assertEqual(expected, {"fun": 30, "transport": 12})
+        snap._sections["transactions"] = {}
+        self.assertEqual(snap.get_category_totals("2025-04-20", "2025-06-30"), expected)
+        self.assertEqual(snap.get_category_totals("2025-05-01", "2025-05-31"), {"fun": 30})
+
+
+if __name__ == "__main__":
+    unittest.main()
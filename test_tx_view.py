@@ -0,0 +1,51 @@
+import unittest
+from tx_view import TransactionPager, format_transaction
+
+class TestTransactionPager(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+
+        def counting_formatter(t):
+            self.calls += 1
+            return format_transaction(t)
+
+        self.pager = TransactionPager(counting_formatter)
+        self.rows = [{"type": "expense", "amount": float((i * 7919) % 1000), "description": "",
+                      "category": "food", "timestamp": f"2025-05-11T10:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}"}
+                     for i in range(5000)]
+        self.pager.set_rows(self.rows)
+
+    def test_formats_only_visible_rows(self):
+        """Test a page formats just its rows, and only once"""
+        page = self.pager.page(10)
+        self.assertEqual([idx for idx, _ in page], list(range(10)))
+        self.assertEqual(self.calls, 10)
+        self.pager.page(10)
+        self.assertEqual(self.calls, 10)
+        self.pager.scroll_to(4995, 10)  # clamped to the last full page
+        self.assertEqual(self.pager.offset, 4990)
+        self.assertEqual(len(self.pager.page(10)), 10)
+        self.assertEqual(self.calls, 20)
+
+    def test_sort_keeps_original_indices(self):
+        """Test sorting reorders positions but rows keep their index for edit/delete"""
+        self.pager.sort("amount", descending=True)
+        page = self.pager.page(5)
+        amounts = [self.rows[idx]["amount"] for idx, _ in page]
+        self.assertEqual(amounts, sorted(amounts, reverse=True))
+        self.assertEqual(amounts[0], max(t["amount"] for t in self.rows))
+        for idx, text in page:
+            self.assertEqual(text, format_transaction(self.rows[idx]))
+
+        self.pager.sort("entry", descending=True)
+        self.assertEqual(self.pager.row_index(0), 4999)
+        self.pager.sort("entry")
+        self.assertIsNone(self.pager.order)
+
+    def test_recurring_marker(self):
+        """Test generated occurrences are marked"""
+        t = {"type": "income", "amount": 5, "category": "salary", "recurring_id": 1}
+        self.assertEqual(format_transaction(t), "↻ +$5.00 (income) [salary]")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+from logic import FinancialTracker
+from viewcache import MonthViewCache, adjacent_months
+
+class TestMonthViewCache(unittest.TestCase):
+    def setUp(self):
+        self.test_data_file = "test_data.json"
+        if os.path.exists(self.test_data_file):
+            os.remove(self.test_data_file)
+        self.tracker = FinancialTracker(data_file=self.test_data_file)
+        self.tracker.add_transaction("2025-05-10", 1000, "income", "Salary")
+        self.cache = MonthViewCache(self.tracker, max_months=3)
+        self.tracker.subscribe(self.cache.invalidate)
+
+    def tearDown(self):
+        if os.path.exists(self.test_data_file):
+            os.remove(self.test_data_file)
+
+    def test_cells(self):
+        """Test month cells carry text and style per display mode"""
+        view = self.cache.get(2025, 5, "date_only")
+        self.assertEqual(view.first_weekday, 3)  # 1 May 2025 is a Thursday
+        self.assertEqual(len(view.cells), 31)
+        self.assertEqual(view.cells["2025-05-01"], ("1", "TButton"))
+        self.assertEqual(view.cells["2025-05-11"][1], "HasLimit.TButton")
+        limit = self.tracker.get_daily_limit("2025-05-11")
+        self.assertEqual(self.cache.get(2025, 5, "show_remaining").cells["2025-05-11"][0], f"{limit:.0f}")
+
+    def test_hits_and_lru_eviction(self):
+        """Test repeated lookups hit and the oldest month is evicted"""
+        self.cache.get(2025, 4, "date_only")
+        self.cache.get(2025, 5, "date_only")
+        self.assertIs(self.cache.get(2025, 4, "date_only"), self.cache.get(2025, 4, "date_only"))
+        self.assertEqual(self.cache.misses, 2)
+        self.cache.get(2025, 6, "date_only")
+        self.cache.get(2025, 7, "date_only")  # evicts May, the least recently used
+        self.assertNotIn((2025, 5, "date_only"), self.cache)
+        self.assertIn((2025, 4, "date_only"), self.cache)
+
+    def test_precise_invalidation(self):
+        """Test a mutation only invalidates the months whose dates it touched"""
+        may = self.cache.get(2025, 5, "date_only")
+        self.cache.get(2025, 6, "date_only")
+        self.cache.get(2025, 8, "date_only")
+        # A late-period expense only changes limits until the period ends on 10 June
+        self.tracker.add_transaction("2025-05-30", 5, "expense")
+        self.assertNotIn((2025, 5, "date_only"), self.cache)
+        self.assertNotIn((2025, 6, "date_only"), self.cache)
+        self.assertIn((2025, 8, "date_only"), self.cache)
+        self.assertIsNot(self.cache.get(2025, 5, "date_only"), may)
+        self.assertEqual(self.cache.version(2025, 8), 0)
+
+        self.tracker.set_surplus_settings(True, 3)
+        self.assertNotIn((2025, 8, "date_only"), self.cache)
+
+    def test_adjacent_months(self):
+        self.assertEqual(adjacent_months(2025, 1), ((2024, 12), (2025, 2)))
+        self.assertEqual(adjacent_months(2025, 12), ((2025, 11), (2026, 1)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,8 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox
 
 class EditTransactionDialog(tk.Toplevel):
-    def __init__(self, master, tx):
+    def __init__(self, master, tx, categories=()):
         super().__init__(master)
         self.title("Edit transaction")
         self.grab_set()                       # modal
@@ -12,6 +12,7 @@ class EditTransactionDialog(tk.Toplevel):
         self.var_amount = tk.StringVar(value=f"{tx['amount']:.2f}")
         self.var_type   = tk.StringVar(value=tx['type'])
         self.var_desc   = tk.StringVar(value=tx.get("description", ""))
+        self.var_cat    = tk.StringVar(value=tx.get("category", ""))
 
         frm = ttk.Frame(self, padding=10)
         frm.pack(fill="both", expand=True)
@@ -26,8 +27,12 @@ class EditTransactionDialog(tk.Toplevel):
         ttk.Label(frm, text="Description").grid(row=2, column=0, sticky="e")
         ttk.Entry(frm, textvariable=self.var_desc, width=25).grid(row=2, column=1, pady=3)
 
+        ttk.Label(frm, text="Category").grid(row=3, column=0, sticky="e")
+        ttk.Combobox(frm, textvariable=self.var_cat, values=tuple(categories),
+                     width=22).grid(row=3, column=1, pady=3)
+
         btns = ttk.Frame(frm)
-        btns.grid(row=3, column=0, columnspan=2, pady=(8,0))
+        btns.grid(row=4, column=0, columnspan=2, pady=(8,0))
         ttk.Button(btns, text="Save", command=self._ok).pack(side="left", padx=5)
         ttk.Button(btns, text="Cancel", command=self._cancel).pack(side="left", padx=5)
 
@@ -38,11 +43,13 @@ class EditTransactionDialog(tk.Toplevel):
     def _ok(self):
         try:
             amt = float(self.var_amount.get())
-            assert amt > 0
+            if amt <= 0:
+                raise ValueError("amount must be positive")
             self.result = {
                 "amount": amt,
                 "type": self.var_type.get(),
-                "desc": self.var_desc.get().strip()
+                "desc": self.var_desc.get().strip(),
+                "category": self.var_cat.get().strip()
             }
             self.destroy()
         except Exception:
@@ -0,0 +1,170 @@
+import tkinter as tk
+from tkinter import ttk
+
+SORT_KEYS = {
+    "entry": None,
+    "amount": lambda t: t["amount"],
+    "time": lambda t: t.get("timestamp", ""),
+}
+
+
+def format_transaction(t):
+    """One list line for a transaction (↻ marks recurring occurrences)"""
+    sign = "-" if t["type"] == "expense" else "+"
+    desc = f": {t['description']}" if t.get("description") else ""
+    cat = f" [{t['category']}]" if t.get("category") else ""
+    mark = "↻ " if "recurring_id" in t else ""
+    return f"{mark}{sign}${t['amount']:.2f} ({t['type']}){cat}{desc}"
+
+
+class TransactionPager:
+    """
+    The non-widget half of the virtual list: a sort order over the rows and
+    a scroll offset.  Rows keep their original index whatever the sort, and
+    strings are only formatted for rows that are actually shown.
+    """
+
+    def __init__(self, formatter=format_transaction):
+        self.formatter = formatter
+        self.rows = []
+        self.order = None      # list of row indices, None = entry order
+        self.sort_key = "entry"
+        self.descending = False
+        self.offset = 0
+        self._formatted = {}   # row index: formatted line
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self._formatted = {}
+        self.offset = 0
+        self._build_order()
+
+    def sort(self, key, descending=False):
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {key}")
+        self.sort_key = key
+        self.descending = descending
+        self._build_order()
+
+    def _build_order(self):
+        keyfunc = SORT_KEYS[self.sort_key]
+        if keyfunc is None and not self.descending:
+            self.order = None
+            return
+        indices = range(len(self.rows))
+        if keyfunc is None:
+            self.order = list(reversed(indices))
+        else:
+            self.order = sorted(indices, key=lambda i: keyfunc(self.rows[i]), reverse=self.descending)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def row_index(self, position):
+        """Original row index of the row shown at `position` in the sorted list"""
+        return position if self.order is None else self.order[position]
+
+    def scroll_to(self, offset, visible):
+        self.offset = max(0, min(offset, len(self.rows) - visible))
+
+    def page(self, visible):
+        """(row index, text) pairs of the rows in view"""
+        end = min(len(self.rows), self.offset + visible)
+        result = []
+        for position in range(self.offset, end):
+            idx = self.row_index(position)
+            text = self._formatted.get(idx)
+            if text is None:
+                text = self._formatted[idx] = self.formatter(self.rows[idx])
+            result.append((idx, text))
+        return result
+
+
+class VirtualTransactionList(ttk.Frame):
+    """
+    Listbox that only ever holds the visible rows.  Scrolling swaps the
+    few visible lines instead of keeping thousands of items in the widget.
+    """
+
+    def __init__(self, master, height=6, empty_text="No transactions for this date."):
+        super().__init__(master)
+        self.pager = TransactionPager()
+        self.empty_text = empty_text
+        self._visible = height
+        self._shown = []  # row indices currently in the listbox
+
+        self.listbox = tk.Listbox(self, height=height, activestyle="none")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self._scroll_by(-1))
+        self.listbox.bind("<Button-5>", lambda e: self._scroll_by(1))
+        self.listbox.bind("<Button-3>", self._select_under_pointer, add="+")
+
+    def set_rows(self, rows):
+        self.pager.set_rows(rows)
+        self._render()
+
+    def sort(self, key, descending=False):
+        selected = self.selected_index()
+        self.pager.sort(key, descending)
+        self._render(keep=selected)
+
+    def selected_index(self):
+        """Original index of the selected row, or None"""
+        sel = self.listbox.curselection()
+        if not sel or sel[0] >= len(self._shown):
+            return None
+        return self._shown[sel[0]]
+
+    def bind_context(self, callback):
+        self.listbox.bind("<Button-3>", callback, add="+")
+
+    def _render(self, keep=None):
+        self.listbox.delete(0, tk.END)
+        self._shown = []
+        if not len(self.pager):
+            self.listbox.insert(tk.END, self.empty_text)
+            self.scrollbar.set(0, 1)
+            return
+        self.pager.scroll_to(self.pager.offset, self._visible)
+        for idx, text in self.pager.page(self._visible):
+            self._shown.append(idx)
+            self.listbox.insert(tk.END, text)
+        if keep in self._shown:
+            self.listbox.selection_set(self._shown.index(keep))
+        n = len(self.pager)
+        self.scrollbar.set(self.pager.offset / n, min(1, (self.pager.offset + self._visible) / n))
+
+    def _scroll_by(self, rows):
+        selected = self.selected_index()
+        self.pager.scroll_to(self.pager.offset + rows, self._visible)
+        self._render(keep=selected)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.pager.scroll_to(int(float(value) * len(self.pager)), self._visible)
+            self._render(keep=self.selected_index())
+        elif action == "scroll":
+            step = self._visible if unit == "pages" else 1
+            self._scroll_by(int(value) * step)
+
+    def _on_wheel(self, event):
+        self._scroll_by(-1 if event.delta > 0 else 1)
+        return "break"
+
+    def _on_resize(self, event):
+        line = max(1, self.listbox.winfo_reqheight() // max(1, int(self.listbox.cget("height"))))
+        visible = max(1, event.height // line)
+        if visible != self._visible:
+            self._visible = visible
+            self._render(keep=self.selected_index())
+
+    def _select_under_pointer(self, event):
+        position = self.listbox.nearest(event.y)
+        if 0 <= position < len(self._shown):
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(position)
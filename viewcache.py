@@ -0,0 +1,103 @@
+import datetime
+from calendar import monthrange
+from collections import OrderedDict
+
+DEFAULT_MAX_MONTHS = 24
+
+
+def cell_view(day, limit, spent, counted, mode):
+    """Text and style of a calendar day (the selection highlight is applied on top)"""
+    remaining = limit - counted
+    text = str(day)
+    if mode == "show_remaining":
+        text = f"{remaining:.0f}"
+    elif mode == "show_spent":
+        text = f"{spent:.0f}"
+
+    style = "TButton"
+    if remaining < 0 and limit > 0:  # Exceeded limit (and limit was positive)
+        style = "Exceeded.TButton"
+    elif limit > 0:
+        style = "HasLimit.TButton"
+    return text, style
+
+
+class MonthView:
+    """Computed cells of one month: first weekday, and date_str -> (text, style)"""
+
+    def __init__(self, year, month, mode, version, first_weekday, cells):
+        self.year = year
+        self.month = month
+        self.mode = mode
+        self.version = version
+        self.first_weekday = first_weekday
+        self.cells = cells
+
+
+def build_month(tracker, year, month, mode, version=0):
+    first_weekday, days_in_month = monthrange(year, month)
+    summary = tracker.get_range_summary(f"{year:04d}-{month:02d}-01",
+                                        f"{year:04d}-{month:02d}-{days_in_month:02d}")
+    cells = {date_str: cell_view(i + 1, limit, spent, counted, mode)
+             for i, (date_str, limit, spent, counted) in enumerate(summary)}
+    return MonthView(year, month, mode, version, first_weekday, cells)
+
+
+class MonthViewCache:
+    """
+    LRU cache of month view-models keyed by (year, month, mode, version).
+    Every month has its own data version, bumped only when a change event
+    touches one of its dates, so editing May keeps June's entries valid.
+    """
+
+    def __init__(self, tracker, max_months=DEFAULT_MAX_MONTHS):
+        self.tracker = tracker
+        self.max_months = max_months
+        self._entries = OrderedDict()
+        self._versions = {}  # (year, month): version
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, year, month):
+        return self._versions.get((year, month), 0)
+
+    def get(self, year, month, mode):
+        key = (year, month, mode, self.version(year, month))
+        view = self._entries.get(key)
+        if view is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return view
+        self.misses += 1
+        view = build_month(self.tracker, year, month, mode, key[3])
+        self._entries[key] = view
+        while len(self._entries) > self.max_months:
+            self._entries.popitem(last=False)
+        return view
+
+    def __contains__(self, key):
+        """(year, month, mode) is cached at the current version"""
+        year, month, mode = key
+        return (year, month, mode, self.version(year, month)) in self._entries
+
+    def invalidate(self, event):
+        """Drop the months a ChangeEvent touched (all of them on settings changes)"""
+        if event.settings:
+            months = {(y, m) for y, m, _, _ in self._entries}
+        else:
+            months = {(int(d[:4]), int(d[5:7])) for d in event.dates}
+        for month in months:
+            self._versions[month] = self._versions.get(month, 0) + 1
+        for key in [k for k in self._entries if (k[0], k[1]) in months]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+def adjacent_months(year, month):
+    """(year, month) before and after"""
+    first = datetime.date(year, month, 1)
+    prev = first - datetime.timedelta(days=1)
+    following = first + datetime.timedelta(days=monthrange(year, month)[1])
+    return (prev.year, prev.month), (following.year, following.month)